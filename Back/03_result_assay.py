@@ -1,9 +1,19 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from openai import OpenAI
+import json
 import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 
+from llm_cache import ResponseCache, prompt_key
+from rate_limiter import TokenBudgetScheduler, estimate_tokens
+from single_flight import SingleFlight
+
 load_dotenv()
 
 app = Flask(__name__)
@@ -11,19 +21,110 @@ app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 # OpenAI 클라이언트 초기화
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# (OPENAI_BASE_URL 환경변수로 호환 서버 지정 가능, 재시도는 scheduler가 담당하므로 클라이언트 재시도는 끔)
+client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
+# 분당 요청/토큰 예산 안에서 도착 순서대로 호출하고 429/5xx는 백오프 후 재시도
+scheduler = TokenBudgetScheduler.from_env()
 
-def evaluate_with_suggestions(job_title, position, qa_pairs):
-    try:
-        # ChatGPT에 전달할 프롬프트 구성
-        prompt = f"""
+MODEL = "gpt-3.5-turbo"
+SYSTEM_PROMPT = "당신은 자소서 평가 전문가입니다. 구체적이고 실질적인 피드백을 제공해주세요."
+COMPLETION_PARAMS = {"temperature": 0.7, "max_tokens": 1000}
+
+# 응답에서 점수를 찾지 못했을 때 사용하는 기본 점수
+DEFAULT_SCORE = 85
+SCORE_PATTERN = re.compile(r'종합\s*점수\s*(?:\([^)\n]*\))?\D{0,20}?(\d{1,3}(?:\.\d+)?)')
+
+# 문항별 ChatGPT 호출은 스레드 풀에서 동시에 실행
+# (대부분 응답을 기다리는 I/O라 넉넉하게, 진행 중인 같은 호출을 기다리는 스레드도 풀을 차지함)
+SUGGESTION_CONCURRENCY = int(os.getenv('SUGGESTION_CONCURRENCY', 32))
+# 요청 하나에 받는 최대 문항 수
+MAX_QUESTIONS = int(os.getenv('SUGGESTION_MAX_QUESTIONS', 20))
+# 문항 하나의 최대 평가 시간 (초, 스레드 풀에서 실행을 시작한 시점부터)
+QUESTION_TIMEOUT = float(os.getenv('SUGGESTION_QUESTION_TIMEOUT', 30))
+# 스레드 풀이 모두 사용 중일 때 문항이 실행을 기다리는 최대 시간 (초)
+QUEUE_TIMEOUT = float(os.getenv('SUGGESTION_QUEUE_TIMEOUT', 30))
+question_executor = ThreadPoolExecutor(max_workers=SUGGESTION_CONCURRENCY)
+
+# 같은 프롬프트/모델/파라미터의 응답은 디스크 캐시에서 재사용 (워커 프로세스 간 공유)
+response_cache = ResponseCache.from_env()
+# 같은 프롬프트로 동시에 들어온 호출은 하나만 보내고 결과 공유 (중복 클릭, 여러 탭)
+inflight_calls = SingleFlight()
+
+class StreamCancelled(Exception):
+    """클라이언트 연결 종료/시간 초과로 스트리밍 중단"""
+
+def request_completion(messages, use_cache=True, on_delta=None, deadline=None):
+    """
+    ChatGPT 호출 결과 본문과 캐시 적중 여부 반환
+    use_cache=False면 캐시를 읽지 않고 새로 호출한 뒤 결과로 캐시를 갱신
+    on_delta가 있으면 스트리밍 모드로 호출하여 받은 조각마다 on_delta(text) 호출
+    (캐시 적중이나 진행 중인 같은 호출의 결과를 받은 경우 본문 전체 한 번)
+    deadline: time.monotonic() 기준 마감 시각 (예산 대기와 재시도는 이 시각 안에서만)
+    """
+    key = prompt_key(MODEL, messages, **COMPLETION_PARAMS)
+    if use_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            if on_delta is not None:
+                on_delta(cached)
+            return cached, True
+
+    # 먼저 시작한 스트리밍 호출이 그 클라이언트의 연결 종료로 중단되면 기다리던 호출이 다시 요청
+    content, shared = inflight_calls.do(key, lambda: call_upstream(key, messages, on_delta, deadline),
+                                        retry_on=(StreamCancelled,))
+    if shared and on_delta is not None:
+        on_delta(content)
+    return content, False
+
+def request_timeout(deadline):
+    """HTTP 요청 하나의 시간 제한 (남은 시간, 마감 시각이 없으면 QUESTION_TIMEOUT)"""
+    if deadline is None:
+        return QUESTION_TIMEOUT
+    return max(0.1, deadline - time.monotonic())
+
+def call_upstream(key, messages, on_delta=None, deadline=None):
+    """ChatGPT 호출 후 본문을 캐시에 저장"""
+    # 프롬프트 추정 토큰 + 최대 응답 토큰만큼 분당 토큰 예산 사용
+    budget = estimate_tokens(messages, MODEL) + COMPLETION_PARAMS["max_tokens"]
+    if on_delta is None:
+        # ChatGPT API 호출 (새로운 문법)
+        response = scheduler.call(lambda: client.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            timeout=request_timeout(deadline),
+            **COMPLETION_PARAMS
+        ), budget, deadline)
+        content = response.choices[0].message.content
+    else:
+        # 조각을 받는 대로 넘기고, 캐시/점수 추출용 전체 본문은 모아서 만듦
+        # (429/5xx는 응답 시작 전에 발생하므로 재시도 대상, 전송 중 끊긴 스트림은 재시도하지 않음)
+        parts = []
+        with scheduler.call(lambda: client.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            timeout=request_timeout(deadline),
+            stream=True,
+            **COMPLETION_PARAMS
+        ), budget, deadline) as stream:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+        content = ''.join(parts)
+    response_cache.put(key, content)
+    return content
+
+def build_prompt(job_title, position, qa):
+    """문항 하나의 평가 요청 프롬프트"""
+    return f"""
         직무: {job_title}
         직위: {position}
 
         다음 자소서 답변을 평가하고 개선점을 제안해주세요:
 
-        질문: {qa_pairs[0]['question']}
-        답변: {qa_pairs[0]['answer']}
+        질문: {qa['question']}
+        답변: {qa['answer']}
 
         다음 형식으로 평가해주세요:
         1. 답변의 장점
@@ -32,53 +133,244 @@ def evaluate_with_suggestions(job_title, position, qa_pairs):
         4. 종합 점수 (0~100점 사이 숫자로만)
         """
 
-        # ChatGPT API 호출 (새로운 문법)
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "당신은 자소서 평가 전문가입니다. 구체적이고 실질적인 피드백을 제공해주세요."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-
-        suggestions = response.choices[0].message.content
-
-        # 임시로 점수 추출 시도 (실제로는 정규식 등으로 추출하는 것이 좋음)
-        # 여기서는 예시로 85점을 기본값으로 설정하거나 텍스트에서 파싱
-        score = 85 
-
-        return {
-            "평균점수": score,
-            "상세결과": [{
-                "개선제안": suggestions
-            }]
-        }
+def parse_score(suggestions):
+    """응답의 '종합 점수' 항목에서 0~100 점수 추출 (찾지 못하면 None)"""
+    for match in reversed(SCORE_PATTERN.findall(suggestions or '')):
+        score = float(match)
+        if 0 <= score <= 100:
+            return int(score) if score.is_integer() else score
+    return None
+
+def evaluate_question(job_title, position, qa, use_cache=True, on_delta=None, deadline=None):
+    """문항 하나 평가 -> (개선 제안, 캐시 적중 여부)"""
+    return request_completion([
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_prompt(job_title, position, qa)}
+    ], use_cache, on_delta, deadline)
+
+def question_result(suggestions, cached):
+    score = parse_score(suggestions)
+    return {
+        "개선제안": suggestions,
+        # 점수를 찾지 못하면 기본값 사용
+        "종합점수": score if score is not None else DEFAULT_SCORE,
+        "캐시적중": cached
+    }
+
+def summarize(details):
+    """문항별 결과 -> 응답 본문 (평균점수는 성공한 문항만, 모두 실패하면 error)"""
+    scores = [detail["종합점수"] for detail in details if "종합점수" in detail]
+    if not scores:
+        return {"error": details[0]["error"]}
+
+    return {
+        "평균점수": round(sum(scores) / len(scores), 1),
+        "상세결과": details
+    }
+
+def timeout_message():
+    return f"문항 평가 시간 초과 ({QUESTION_TIMEOUT:g}초)"
+
+class QuestionTask:
+    """
+    스레드 풀에서 실행하는 문항 하나
+    fn(*args, deadline)으로 호출하며, 마감 시각은 큐에서 기다린 시간을 빼고 실행을 시작한 시점부터 계산
+    (다른 요청의 문항 뒤에서 기다리는 동안 제한 시간을 써 버리지 않도록)
+    """
+    def __init__(self, fn, *args):
+        self.queued_at = time.monotonic()
+        self.deadline = None
+        self.started = threading.Event()
+        self.future = question_executor.submit(self._run, fn, args)
+
+    def _run(self, fn, args):
+        self.deadline = time.monotonic() + QUESTION_TIMEOUT
+        self.started.set()
+        return fn(*args, self.deadline)
+
+    def expires_at(self):
+        """시작 전이면 큐 대기 마감, 시작했으면 문항 평가 마감 시각"""
+        if self.started.is_set():
+            return self.deadline
+        return self.queued_at + QUEUE_TIMEOUT
+
+    def expired(self, now):
+        """마감 시각이 지났으면 True (시작 전이면 취소)"""
+        if not self.started.is_set():
+            if now < self.queued_at + QUEUE_TIMEOUT:
+                return False
+            if self.future.cancel():
+                return True
+            # 취소 직전에 실행을 시작한 경우 방금 정해진 문항 마감 시각으로 판단
+            self.started.wait()
+        return now >= self.deadline
+
+    def result(self):
+        """결과 반환 (마감 시각이 지나면 FutureTimeoutError)"""
+        while True:
+            if not self.future.done() and self.expired(time.monotonic()):
+                raise FutureTimeoutError()
+            try:
+                return self.future.result(timeout=max(0, self.expires_at() - time.monotonic()))
+            except FutureTimeoutError:
+                # 3.11부터 FutureTimeoutError는 내장 TimeoutError이므로 문항 자체가 던진 예외는 그대로 전달
+                if self.future.done():
+                    raise
+
+def evaluate_with_suggestions(job_title, position, qa_pairs, use_cache=True):
+    try:
+        # 모든 문항을 동시에 요청 (전체 지연 시간 ~= 가장 느린 문항 하나)
+        tasks = [QuestionTask(evaluate_question, job_title, position, qa, use_cache, None) for qa in qa_pairs]
+
+        # 결과는 문항 순서대로 병합 (시간 초과/실패한 문항은 error만 채움)
+        details = []
+        for i, (qa, task) in enumerate(zip(qa_pairs, tasks)):
+            detail = {"질문번호": i + 1, "질문": qa['question']}
+            try:
+                detail.update(question_result(*task.result()))
+            except FutureTimeoutError:
+                detail["error"] = timeout_message()
+            except Exception as e:
+                print(f"Error in evaluate_with_suggestions (문항 {i + 1}): {str(e)}")
+                detail["error"] = str(e)
+            details.append(detail)
+
+        return summarize(details)
 
     except Exception as e:
         print(f"Error in evaluate_with_suggestions: {str(e)}")
         return {"error": str(e)}
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_suggestions(job_title, position, qa_pairs, use_cache=True):
+    """
+    모든 문항을 동시에 스트리밍 모드로 요청하고 SSE 이벤트를 내보내는 제너레이터
+    - delta: {질문번호, delta} 받은 토큰 조각
+    - question: 문항 하나 완료 (evaluate_with_suggestions의 상세결과 항목과 같은 형식)
+    - done: 전체 결과 (평균점수, 상세결과) / 모든 문항 실패 시 error
+    """
+    events = queue.Queue()
+    cancelled = threading.Event()
+
+    def run(i, qa, deadline):
+        def on_delta(text):
+            if cancelled.is_set():
+                raise StreamCancelled()
+            events.put(('delta', i, text))
+        try:
+            events.put(('done', i, evaluate_question(job_title, position, qa, use_cache, on_delta, deadline)))
+        except Exception as e:
+            events.put(('error', i, e))
+
+    tasks = [QuestionTask(run, i, qa) for i, qa in enumerate(qa_pairs)]
+    details = [None] * len(qa_pairs)
+    remaining = len(qa_pairs)
+    try:
+        while remaining:
+            expires_at = min(task.expires_at() for task, detail in zip(tasks, details) if detail is None)
+            try:
+                kind, i, value = events.get(timeout=max(0, expires_at - time.monotonic()))
+            except queue.Empty:
+                # 마감 시각이 지난 문항은 시간 초과로 끝냄
+                now = time.monotonic()
+                for i, task in enumerate(tasks):
+                    if details[i] is None and task.expired(now):
+                        details[i] = {"질문번호": i + 1, "질문": qa_pairs[i]['question'], "error": timeout_message()}
+                        remaining -= 1
+                        yield sse_event('question', details[i])
+                continue
+            if details[i] is not None:
+                # 이미 시간 초과로 끝낸 문항의 늦은 이벤트
+                continue
+            if kind == 'delta':
+                yield sse_event('delta', {"질문번호": i + 1, "delta": value})
+                continue
+            detail = {"질문번호": i + 1, "질문": qa_pairs[i]['question']}
+            if kind == 'done':
+                detail.update(question_result(*value))
+            else:
+                print(f"Error in stream_suggestions (문항 {i + 1}): {str(value)}")
+                detail["error"] = str(value)
+            details[i] = detail
+            remaining -= 1
+            yield sse_event('question', detail)
+
+        result = summarize(details)
+        yield sse_event('error' if 'error' in result else 'done', result)
+    finally:
+        # 남은 호출은 다음 조각을 받을 때 중단하고, 시작 전인 호출은 취소
+        cancelled.set()
+        for task in tasks:
+            task.future.cancel()
+
+def read_suggestion_request():
+    """요청 본문 검증 -> (직무, 직위, qa_pairs, 캐시 사용 여부), 형식 오류면 ValueError"""
+    data = request.json
+    job_title = data.get('직무')
+    position = data.get('직위')
+    qa_pairs = data.get('qa_pairs')
+
+    if not all([job_title, position, qa_pairs]):
+        raise ValueError("필수 데이터가 누락되었습니다.")
+    if not isinstance(qa_pairs, list) or not all(
+            isinstance(qa, dict) and 'question' in qa and 'answer' in qa for qa in qa_pairs):
+        raise ValueError("qa_pairs는 question/answer 항목의 목록이어야 합니다.")
+    if len(qa_pairs) > MAX_QUESTIONS:
+        raise ValueError(f"qa_pairs는 최대 {MAX_QUESTIONS}개까지 보낼 수 있습니다.")
+
+    # 캐시 우회: 요청 본문 "no_cache": true 또는 Cache-Control: no-cache 헤더
+    use_cache = not (data.get('no_cache') or 'no-cache' in request.headers.get('Cache-Control', ''))
+    return job_title, position, qa_pairs, use_cache
+
 @app.route('/api/evaluate-with-suggestions', methods=['POST', 'OPTIONS'])
 def evaluate_suggestions():
     if request.method == 'OPTIONS':
         return '', 200
 
     try:
-        data = request.json
-        job_title = data.get('직무')
-        position = data.get('직위')
-        qa_pairs = data.get('qa_pairs')
-
-        if not all([job_title, position, qa_pairs]):
-            return jsonify({"error": "필수 데이터가 누락되었습니다."}), 400
+        try:
+            job_title, position, qa_pairs, use_cache = read_suggestion_request()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        result = evaluate_with_suggestions(job_title, position, qa_pairs)
+        result = evaluate_with_suggestions(job_title, position, qa_pairs, use_cache)
         return jsonify(result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/evaluate-with-suggestions/stream', methods=['POST', 'OPTIONS'])
+def evaluate_suggestions_stream():
+    """
+    개선 제안 스트리밍 (text/event-stream)
+    요청 본문은 /api/evaluate-with-suggestions와 같고, 토큰 조각(delta) -> 문항 완료(question) -> 전체 결과(done) 순서로 전송
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+
+    try:
+        job_title, position, qa_pairs, use_cache = read_suggestion_request()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return Response(
+        stream_with_context(stream_suggestions(job_title, position, qa_pairs, use_cache)),
+        mimetype='text/event-stream',
+        # 프록시가 이벤트를 모아서 보내지 않도록
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    return jsonify({
+        "cache": response_cache.stats(),
+        "single_flight": inflight_calls.stats(),
+        "scheduler": scheduler.stats()
+    })
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
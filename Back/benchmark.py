@@ -0,0 +1,139 @@
+# benchmark.py
+"""
+OpenAI 호출 스케줄러 벤치마크 (rate limit을 흉내내는 로컬 가짜 서버 대상, 실제 API 호출 없음)
+
+같은 요청 묶음을 세 가지 방식으로 보내고 성공률, 처리량, 지연 시간, upstream 호출 수, 429 수를 JSON으로 출력합니다.
+- naive: 재시도 없이 바로 호출 (스케줄러 도입 전처럼 rate limit에 걸리면 그대로 실패)
+- sdk: OpenAI SDK 기본 재시도 (max_retries=2)
+- scheduler: TokenBudgetScheduler (분당 요청/토큰 예산 + FIFO 대기열 + 지터 백오프 재시도)
+
+    python benchmark.py --requests 120 --concurrency 16 --rpm 40 --tpm 40000 --window 2
+    python benchmark.py --modes naive scheduler --error-rate 0.05 --output result.json
+
+--window로 한도 구간(기본 60초)을 줄여 분 단위 한도를 짧은 시간에 재현합니다.
+--budget-ratio로 스케줄러 예산을 서버 한도보다 크게/작게 잡아 추정이 어긋난 상황도 볼 수 있습니다.
+"""
+import argparse
+import json
+import math
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from fake_openai import start_fake_server
+from rate_limiter import TokenBudgetScheduler, estimate_tokens
+
+MODES = ('naive', 'sdk', 'scheduler')
+MAX_TOKENS = 1000
+ANSWER = ("학부 시절 교내 동아리 웹 서비스의 응답 속도 문제를 해결한 경험이 있습니다. 사용자 수가 늘면서 페이지 로딩이 "
+          "5초 이상 걸렸고, 쿼리 로그를 분석해 중복 조회를 캐시로 바꾸고 인덱스를 추가해 1초 이내로 줄였습니다. ")
+
+
+def percentile(sorted_values, pct):
+    """정렬된 값의 nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_messages(i):
+    """요청마다 다른 프롬프트 (가짜 서버 응답/캐시와 무관하게 모두 새 호출)"""
+    return [
+        {"role": "system", "content": "당신은 자소서 평가 전문가입니다."},
+        {"role": "user", "content": f"요청 {i}\n질문: 문제 해결 경험을 기술해주세요.\n답변: {ANSWER}"}
+    ]
+
+
+def run_mode(mode, args):
+    server = start_fake_server(delay=args.delay)
+    server.limit(args.rpm, args.tpm, args.window, args.error_rate, args.seed)
+    client = OpenAI(api_key='test', base_url=server.base_url, max_retries=2 if mode == 'sdk' else 0)
+    scheduler = TokenBudgetScheduler(rpm=args.rpm * args.budget_ratio, tpm=args.tpm * args.budget_ratio,
+                                     max_retries=args.max_retries, base_delay=args.base_delay,
+                                     max_delay=args.window, window=args.window, margin=args.margin)
+
+    def send(i):
+        messages = build_messages(i)
+        create = lambda: client.chat.completions.create(model='gpt-3.5-turbo', messages=messages,
+                                                        max_tokens=MAX_TOKENS, timeout=args.timeout)
+        start = time.perf_counter()
+        try:
+            if mode == 'scheduler':
+                scheduler.call(create, estimate_tokens(messages) + MAX_TOKENS, time.monotonic() + args.timeout)
+            else:
+                create()
+            return True, time.perf_counter() - start
+        except Exception:
+            return False, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(send, range(args.requests)))
+    duration = time.perf_counter() - start
+    server.shutdown()
+
+    latencies = sorted(latency for ok, latency in results if ok)
+    succeeded = len(latencies)
+    ms = lambda value: None if value is None else round(value * 1000, 1)
+    report = {
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'success_rate': round(succeeded / len(results), 3),
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(succeeded / duration, 2),
+        'latency_ms': {
+            'p50': ms(percentile(latencies, 50)),
+            'p95': ms(percentile(latencies, 95)),
+            'max': ms(latencies[-1]) if latencies else None
+        },
+        'upstream_requests': server.requests,
+        'throttled_429': server.throttled,
+        'server_errors_500': server.server_errors
+    }
+    if mode == 'scheduler':
+        stats = scheduler.stats()
+        report['scheduler'] = {key: stats[key] for key in
+                               ('retries', 'rate_limited', 'server_errors', 'failures', 'timeouts',
+                                'queue_wait_avg_s', 'queue_wait_max_s')}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호출 스케줄러 벤치마크 (가짜 서버)")
+    parser.add_argument('--modes', nargs='*', choices=MODES, default=list(MODES))
+    parser.add_argument('--requests', type=int, default=120)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rpm', type=int, default=40, help='가짜 서버의 window당 요청 한도')
+    parser.add_argument('--tpm', type=int, default=40000, help='가짜 서버의 window당 토큰 한도')
+    parser.add_argument('--window', type=float, default=2.0, help='한도 계산 구간 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.02, help='가짜 서버 500 응답 비율')
+    parser.add_argument('--delay', type=float, default=0.05, help='가짜 서버 응답 지연 (초)')
+    parser.add_argument('--budget-ratio', type=float, default=1.0, help='스케줄러 예산 / 서버 한도')
+    parser.add_argument('--margin', type=float, default=0.1, help='스케줄러 예산 구간 여유 (초)')
+    parser.add_argument('--max-retries', type=int, default=5)
+    parser.add_argument('--base-delay', type=float, default=0.2, help='백오프 기본 대기 (초)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='요청 하나의 마감 시간 (초)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    report = {
+        'benchmark': 'scheduler',
+        'python': platform.python_version(),
+        'config': {key: getattr(args, key) for key in
+                   ('requests', 'concurrency', 'rpm', 'tpm', 'window', 'error_rate', 'delay', 'budget_ratio',
+                    'margin', 'max_retries', 'base_delay', 'timeout')},
+        'results': {mode: run_mode(mode, args) for mode in args.modes}
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
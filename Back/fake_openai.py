@@ -0,0 +1,247 @@
+# fake_openai.py
+"""
+로컬 테스트용 OpenAI 호환 가짜 서버 (POST .../chat/completions)
+
+실제 API 대신 이 서버로 요청을 보내 캐시/동시 호출 동작을 비용 없이 확인합니다.
+응답 본문은 프롬프트 해시로 정해지는 고정 문장과 "종합 점수: NN점"입니다.
+"stream": true 요청에는 본문을 stream_chunk_size 글자씩 나눠 chunked 전송 SSE(data: ...)로 보냅니다.
+rpm/tpm을 지정하면 window초 동안의 요청 수/토큰 수(프롬프트 추정 + max_tokens, OpenAI와 같은 방식)가
+한도를 넘을 때 429와 Retry-After를, error_rate 비율로 500을 돌려줘 rate limit 상황을 흉내냅니다.
+
+    python fake_openai.py --port 8001 --delay 0.5
+    python fake_openai.py --port 8001 --stream-delay 0.05     # 스트리밍 조각 사이 지연
+    python fake_openai.py --port 8001 --rpm 60 --tpm 40000 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=test python 03_result_assay.py
+"""
+import argparse
+import collections
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rate_limiter import estimate_tokens
+
+
+def fake_reply(messages):
+    """마지막 사용자 메시지로 정해지는 평가 문장 (같은 프롬프트 -> 같은 응답)"""
+    prompt = messages[-1]['content'] if messages else ''
+    digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+    score = 60 + digest[0] % 40
+    return (f"1. 답변의 장점: 경험이 구체적입니다.\n"
+            f"2. 개선이 필요한 부분: 직무와의 연결이 약합니다.\n"
+            f"3. 구체적인 개선 제안: 성과를 수치로 제시하세요. ({digest.hex()[:8]})\n"
+            f"4. 종합 점수: {score}점")
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, delay=0.0, stream_delay=0.0, stream_chunk_size=8):
+        super().__init__(address, FakeOpenAIHandler)
+        self.delay = delay              # 응답 전 대기 시간 (초, 실제 API 지연 흉내)
+        self.stream_delay = stream_delay            # 스트리밍 조각 사이 대기 시간 (초)
+        self.stream_chunk_size = stream_chunk_size  # 스트리밍 조각 하나의 글자 수
+        self.slow_prompts = {}          # {프롬프트에 포함된 문자열: 대기 시간} (특정 문항만 느리게)
+        self.held_prompts = {}          # {프롬프트에 포함된 문자열: threading.Event} (set될 때까지 응답 보류)
+        self.stream_gate = None         # threading.Event면 스트리밍 첫 조각 뒤 set될 때까지 보류
+        self.lock = threading.Lock()
+        self.requests = 0               # 받은 completion 요청 수
+        self.stream_requests = 0        # 그중 stream=true 요청 수
+        self.in_flight = 0
+        self.max_in_flight = 0          # 동시에 처리 중이던 요청 수의 최댓값
+        # rate limit 흉내 (0이면 제한 없음)
+        self.rpm = 0
+        self.tpm = 0
+        self.window = 60.0
+        self.error_rate = 0.0
+        self.random = random.Random(42)
+        self.admitted = collections.deque()   # window 안에 받아들인 (시각, 토큰 수)
+        self.throttled = 0              # 429로 거절한 요청 수
+        self.server_errors = 0          # 500으로 실패시킨 요청 수
+
+    def limit(self, rpm=0, tpm=0, window=60.0, error_rate=0.0, seed=42):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.admitted.clear()
+
+    def admit(self, tokens):
+        """한도 안이면 None, 넘으면 다시 시도할 수 있을 때까지의 시간 (server.lock 안에서 호출)"""
+        now = time.monotonic()
+        while self.admitted and self.admitted[0][0] <= now - self.window:
+            self.admitted.popleft()
+        used = sum(amount for _, amount in self.admitted)
+        over_requests = self.rpm and len(self.admitted) >= self.rpm
+        over_tokens = self.tpm and used + tokens > self.tpm
+        if not over_requests and not over_tokens:
+            self.admitted.append((now, tokens))
+            return None
+        # 가장 오래된 기록이 window를 벗어날 때까지
+        return max(0.001, self.admitted[0][0] + self.window - now) if self.admitted else self.window
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 연결을 먼저 끊은 경우(시간 초과, 스트림 중단)는 정상 동작
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 시간 초과로 먼저 연결을 끊은 경우
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        """Transfer-Encoding: chunked 조각 하나 전송"""
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_stream(self, body, content):
+        server = self.server
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        size = max(1, server.stream_chunk_size)
+        pieces = [{'role': 'assistant', 'content': ''}] + \
+                 [{'content': content[i:i + size]} for i in range(0, len(content), size)]
+        created = int(time.time())
+        try:
+            for n, delta in enumerate(pieces + [{}]):
+                if n > 1 and server.stream_gate is not None:
+                    server.stream_gate.wait()
+                if n > 1 and server.stream_delay:
+                    time.sleep(server.stream_delay)
+                chunk = {
+                    'id': f'chatcmpl-fake-{server.requests}',
+                    'object': 'chat.completion.chunk',
+                    'created': created,
+                    'model': body.get('model', 'fake'),
+                    'choices': [{'index': 0, 'delta': delta, 'finish_reason': None if delta else 'stop'}]
+                }
+                self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if not self.path.endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found', 'type': 'invalid_request_error'}})
+            return
+
+        server = self.server
+        messages = body.get('messages', [])
+        prompt_tokens = estimate_tokens(messages, body.get('model'))
+        with server.lock:
+            server.requests += 1
+            if body.get('stream'):
+                server.stream_requests += 1
+            wait = server.admit(prompt_tokens + (body.get('max_tokens') or 0)) if server.rpm or server.tpm else None
+            if wait is not None:
+                server.throttled += 1
+            failed = wait is None and server.error_rate and server.random.random() < server.error_rate
+            if failed:
+                server.server_errors += 1
+        if wait is not None:
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'requests',
+                                            'code': 'rate_limit_exceeded'}},
+                            {'retry-after': str(max(1, round(wait))), 'retry-after-ms': str(int(wait * 1000))})
+            return
+        if failed:
+            self._send_json(500, {'error': {'message': 'The server had an error', 'type': 'server_error'}})
+            return
+
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            prompt = messages[-1]['content'] if messages else ''
+            delay = max([server.delay] + [seconds for marker, seconds in server.slow_prompts.items()
+                                          if marker in prompt])
+            if delay:
+                time.sleep(delay)
+            for marker, released in list(server.held_prompts.items()):
+                if marker in prompt:
+                    released.wait()
+            content = fake_reply(messages)
+            if body.get('stream'):
+                self._send_stream(body, content)
+                return
+            self._send_json(200, {
+                'id': f'chatcmpl-fake-{server.requests}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', 'fake'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(content),
+                          'total_tokens': prompt_tokens + len(content)}
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+def start_fake_server(delay=0.0, stream_delay=0.0, host='127.0.0.1', port=0):
+    """백그라운드 스레드에서 가짜 서버 실행 (port=0이면 빈 포트) -> 서버 객체 (base_url 속성)"""
+    server = FakeOpenAIServer((host, port), delay, stream_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 가짜 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--delay', type=float, default=0.0, help='응답 지연 (초)')
+    parser.add_argument('--stream-delay', type=float, default=0.0, help='스트리밍 조각 사이 지연 (초)')
+    parser.add_argument('--rpm', type=int, default=0, help='window당 요청 한도 (0: 제한 없음)')
+    parser.add_argument('--tpm', type=int, default=0, help='window당 토큰 한도 (0: 제한 없음)')
+    parser.add_argument('--window', type=float, default=60.0, help='한도 계산 구간 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500 응답 비율')
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer((args.host, args.port), args.delay, args.stream_delay)
+    server.limit(args.rpm, args.tpm, args.window, args.error_rate)
+    print(f"가짜 OpenAI 서버: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# llm_cache.py
+"""
+ChatGPT 응답 디스크 캐시 (sqlite 파일 하나를 여러 워커 프로세스가 공유)
+
+- 키: 모델 + 메시지 전체(시스템/사용자 프롬프트) + 생성 파라미터(temperature, max_tokens)의 sha256
+- 만료: 저장 후 ttl초가 지난 항목은 조회하지 않고 지움
+- 크기 제한: max_entries개를 넘으면 가장 오래 조회되지 않은 항목부터 삭제
+- 캐시 파일 오류는 요청을 실패시키지 않고 캐시 미적중으로 처리
+
+환경변수: LLM_CACHE_PATH (기본 Back/llm_cache.sqlite3), LLM_CACHE_TTL (초, 기본 86400),
+LLM_CACHE_SIZE (기본 10000), LLM_CACHE=off (캐시 끄기)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'llm_cache.sqlite3')
+
+
+def prompt_key(model, messages, **params):
+    """모델/메시지/생성 파라미터가 모두 같을 때만 같은 키"""
+    payload = json.dumps({'model': model, 'messages': messages, 'params': params},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=86400.0, max_entries=10000, enabled=True):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled
+        self._local = threading.local()   # 스레드별 연결 (sqlite 연결은 스레드 간 공유 불가)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.getenv('LLM_CACHE_PATH') or DEFAULT_CACHE_PATH,
+            ttl=float(os.getenv('LLM_CACHE_TTL', 86400)),
+            max_entries=int(os.getenv('LLM_CACHE_SIZE', 10000)),
+            enabled=os.getenv('LLM_CACHE', 'on').lower() not in ('off', '0', 'false')
+        )
+
+    def _connection(self):
+        # fork 전에 만든 연결은 자식 프로세스에서 쓰지 않고 새로 연결
+        if getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')       # 읽기와 쓰기가 서로 막지 않도록
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS responses ('
+                         'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                         'created_at REAL NOT NULL, accessed_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key):
+        """캐시된 응답 본문 (없거나 만료되었으면 None)"""
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connection()
+            row = conn.execute('SELECT value, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            now = time.time()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                row = None
+            if row is None:
+                self._count('misses')
+                return None
+            conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self._count('hits')
+            return row[0]
+        except sqlite3.Error as e:
+            print(f"LLM 캐시 조회 실패: {e}")
+            self._count('errors')
+            return None
+
+    def put(self, key, value):
+        """응답 저장 후 만료 항목과 크기 제한을 넘는 항목 삭제"""
+        if not self.enabled or value is None:
+            return
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) '
+                             'VALUES (?, ?, ?, ?)', (key, value, now, now))
+                conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl,))
+                excess = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute('DELETE FROM responses WHERE key IN '
+                                 '(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)', (excess,))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            print(f"LLM 캐시 저장 실패: {e}")
+            self._count('errors')
+
+    def stats(self):
+        """이 프로세스의 조회 통계와 캐시 파일 전체 항목 수"""
+        entries = None
+        if self.enabled:
+            try:
+                entries = self._connection().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            except sqlite3.Error:
+                pass
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors
+        }
@@ -0,0 +1,234 @@
+# rate_limiter.py
+"""
+OpenAI 호출 스케줄러 (분당 요청 수/토큰 수 예산 + FIFO 대기열 + 재시도)
+
+- 요청 전에 프롬프트 토큰 수를 추정하고 (tiktoken이 있으면 사용, 없으면 글자 수 기반 근사)
+  max_tokens를 더한 값을 분당 토큰 예산(TPM)에서, 요청 1개를 분당 요청 예산(RPM)에서 차감
+- 예산은 최근 1분 동안 사용한 양으로 계산하고 (슬라이딩 윈도우, 어느 1분 구간에서도 한도를 넘지 않음),
+  대기열 맨 앞 요청만 예산을 가져갈 수 있어 도착 순서대로 처리
+  (보낸 시각과 서버가 받은 시각의 차이만큼 서버 쪽 기록이 늦게 빠지므로 margin초를 더 기다림)
+- 429/5xx/연결 오류는 지터를 준 지수 백오프로 재시도 (Retry-After 헤더가 있으면 그 이상 대기),
+  429를 받으면 모든 요청이 그 시간 동안 대기
+- OpenAI도 요청 시점에 max_tokens를 포함해 한도를 차감하므로 실제 사용량(usage)으로 돌려받지 않음
+
+환경변수: OPENAI_RPM (기본 500), OPENAI_TPM (기본 60000), OPENAI_MAX_RETRIES (기본 5)
+예산은 프로세스 단위이므로 워커가 여러 개면 워커 수로 나눈 값을 설정합니다.
+"""
+import collections
+import os
+import random
+import threading
+import time
+
+import openai
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class SchedulerTimeout(Exception):
+    """마감 시간 안에 예산을 얻지 못했거나 재시도를 마치지 못함"""
+
+
+def estimate_tokens(messages, model=None):
+    """메시지 목록의 프롬프트 토큰 수 추정 (메시지당 형식 토큰 4개 포함)"""
+    encoding = None
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model or 'gpt-3.5-turbo')
+        except KeyError:
+            encoding = tiktoken.get_encoding('cl100k_base')
+    total = 3
+    for message in messages:
+        content = message.get('content') or ''
+        if encoding is not None:
+            total += len(encoding.encode(content))
+        else:
+            # 영문/숫자는 약 4글자당 1토큰, 한글 등 비 ASCII 문자는 글자당 약 1토큰
+            ascii_chars = sum(1 for ch in content if ord(ch) < 128)
+            total += (ascii_chars + 3) // 4 + (len(content) - ascii_chars)
+        total += 4
+    return total
+
+
+def is_retryable(error):
+    """429, 5xx, 연결 오류/시간 초과만 재시도"""
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def retry_after(error):
+    """응답의 Retry-After(초) 또는 retry-after-ms 헤더 값 (없으면 None)"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+    return None
+
+
+class WindowBudget:
+    """최근 window초 동안 사용한 양이 capacity를 넘지 않도록 관리"""
+
+    def __init__(self, capacity, window=60.0):
+        self.capacity = float(capacity)
+        self.window = window
+        self.entries = collections.deque()   # (사용 시각, 양)
+        self.used = 0.0
+
+    def expire(self, now):
+        while self.entries and self.entries[0][0] <= now - self.window:
+            self.used -= self.entries.popleft()[1]
+
+    def wait_time(self, amount, now):
+        """amount를 더 쓰려면 기다려야 하는 시간 (오래된 사용 기록이 window를 벗어날 때까지, 초)"""
+        excess = self.used + amount - self.capacity
+        if excess <= 0:
+            return 0.0
+        for at, spent in self.entries:
+            excess -= spent
+            if excess <= 0:
+                return at + self.window - now
+        return self.window
+
+    def take(self, amount, now):
+        self.entries.append((now, amount))
+        self.used += amount
+
+    def available(self):
+        return max(0.0, self.capacity - self.used)
+
+
+class TokenBudgetScheduler:
+    def __init__(self, rpm=500, tpm=60000, max_retries=5, base_delay=0.5, max_delay=20.0, window=60.0,
+                 margin=1.0):
+        self.requests = WindowBudget(rpm, window + margin)
+        self.tokens = WindowBudget(tpm, window + margin)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._queue = collections.deque()   # 예산을 기다리는 요청 (도착 순서)
+        self._paused_until = 0.0             # 429 이후 모든 요청이 기다려야 하는 시각
+        self.started = 0
+        self.upstream_calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            rpm=int(os.getenv('OPENAI_RPM', 500)),
+            tpm=int(os.getenv('OPENAI_TPM', 60000)),
+            max_retries=int(os.getenv('OPENAI_MAX_RETRIES', 5))
+        )
+
+    def acquire(self, tokens, deadline=None):
+        """대기열 순서대로 요청 1개 + tokens 예산을 얻을 때까지 대기 -> 대기 시간(초)"""
+        tokens = min(tokens, self.tokens.capacity)   # 한도보다 큰 요청도 언젠가는 보낼 수 있도록
+        ticket = object()
+        start = time.monotonic()
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._queue[0] is ticket:
+                        self.requests.expire(now)
+                        self.tokens.expire(now)
+                        wait = max(self._paused_until - now, self.requests.wait_time(1, now),
+                                   self.tokens.wait_time(tokens, now))
+                        if wait <= 0:
+                            self.requests.take(1, now)
+                            self.tokens.take(tokens, now)
+                            break
+                    else:
+                        wait = None   # 앞 요청이 예산을 가져가면 notify_all로 깨어남
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0 or (wait is not None and wait > remaining):
+                            self.timeouts += 1
+                            raise SchedulerTimeout('OpenAI 호출 예산 대기 시간 초과')
+                        wait = remaining if wait is None else wait
+                    self._cond.wait(wait)
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+            waited = time.monotonic() - start
+            self.queue_wait_total += waited
+            self.queue_wait_max = max(self.queue_wait_max, waited)
+            return waited
+
+    def backoff(self, attempt, error):
+        """attempt번째 재시도 전 대기 시간 (full jitter, Retry-After 이상)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        hinted = retry_after(error)
+        return max(delay, hinted) if hinted is not None else delay
+
+    def call(self, fn, tokens, deadline=None):
+        """예산을 얻은 뒤 fn() 실행, 재시도 가능한 오류는 백오프 후 다시 예산을 얻어 재시도"""
+        with self._cond:
+            self.started += 1
+        attempt = 0
+        while True:
+            self.acquire(tokens, deadline)
+            with self._cond:
+                self.upstream_calls += 1
+            try:
+                return fn()
+            except Exception as e:
+                retryable = is_retryable(e)
+                with self._cond:
+                    if isinstance(e, openai.RateLimitError):
+                        self.rate_limited += 1
+                    elif isinstance(e, openai.APIStatusError) and e.status_code >= 500:
+                        self.server_errors += 1
+                    if not retryable or attempt >= self.max_retries:
+                        self.failures += 1
+                        raise
+                    delay = self.backoff(attempt, e)
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        self.failures += 1
+                        raise
+                    if isinstance(e, openai.RateLimitError):
+                        # 설정한 예산이 실제 한도보다 크거나 다른 프로세스와 한도를 나눠 쓰는 경우이므로 다른 요청도 같이 쉼
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    self.retries += 1
+                attempt += 1
+                time.sleep(delay)
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            self.requests.expire(now)
+            self.tokens.expire(now)
+            return {
+                'rpm': int(self.requests.capacity),
+                'tpm': int(self.tokens.capacity),
+                'queued': len(self._queue),
+                'requests_available': int(self.requests.available()),
+                'tokens_available': int(self.tokens.available()),
+                'started': self.started,
+                'upstream_calls': self.upstream_calls,
+                'retries': self.retries,
+                'rate_limited': self.rate_limited,
+                'server_errors': self.server_errors,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'queue_wait_avg_s': round(self.queue_wait_total / self.upstream_calls, 4) if self.upstream_calls else 0.0,
+                'queue_wait_max_s': round(self.queue_wait_max, 4)
+            }
@@ -0,0 +1,63 @@
+# single_flight.py
+"""
+같은 키의 호출 합치기 (single-flight)
+
+같은 프롬프트의 ChatGPT 호출이 이미 진행 중이면 새로 호출하지 않고 먼저 시작한 호출의
+결과(또는 예외)를 함께 받습니다. 프로세스 단위이며, 끝난 결과의 재사용은 응답 캐시가 담당합니다.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}        # 키 -> 진행 중인 호출의 Future
+        self.upstream = 0       # 실제로 실행한 호출 수
+        self.coalesced = 0      # 진행 중인 호출에 합쳐진 호출 수
+
+    def do(self, key, fn, retry_on=()):
+        """
+        fn() 결과와 공유 여부 반환 (같은 키로 진행 중인 호출이 있으면 그 결과를 기다림)
+        retry_on: 먼저 시작한 호출이 이 예외로 끝나면 (그 호출자 사정으로 중단된 경우) 다시 시도
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._calls[key] = future
+                    self.upstream += 1
+                else:
+                    self.coalesced += 1
+
+            if not leader:
+                try:
+                    return future.result(), True
+                except retry_on:
+                    continue
+
+            try:
+                result = fn()
+            except BaseException as e:
+                # 결과를 알리기 전에 키를 먼저 내려야 재시도하는 대기자나 새 호출자가 끝난 Future에 붙지 않음
+                self._forget(key, future)
+                future.set_exception(e)
+                raise
+            self._forget(key, future)
+            future.set_result(result)
+            return result, False
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'upstream': self.upstream,
+                'coalesced': self.coalesced
+            }
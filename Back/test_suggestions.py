@@ -0,0 +1,350 @@
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_openai import fake_reply, start_fake_server
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_app(fake_server, cache_path):
+    """가짜 서버와 임시 캐시 파일을 쓰도록 환경변수를 바꾼 뒤 03_result_assay.py 로드"""
+    os.environ['OPENAI_BASE_URL'] = fake_server.base_url
+    os.environ['OPENAI_API_KEY'] = 'test'
+    os.environ['LLM_CACHE_PATH'] = cache_path
+    spec = importlib.util.spec_from_file_location('result_assay', os.path.join(BASE_DIR, '03_result_assay.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def iter_events(chunks):
+    """SSE 응답 조각 -> (이벤트 이름, 데이터)를 도착하는 대로 하나씩"""
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk
+        while '\n\n' in buffer:
+            raw, buffer = buffer.split('\n\n', 1)
+            fields = dict(line.split(': ', 1) for line in raw.splitlines())
+            yield fields['event'], json.loads(fields['data'])
+
+
+def read_events(response):
+    """SSE 응답 -> [(이벤트 이름, 데이터)]"""
+    return list(iter_events(response.response))
+
+
+def wait_until(condition, timeout=10.0):
+    """condition()이 참이 될 때까지 대기 (시간 안에 참이 되지 않으면 실패)"""
+    give_up = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < give_up, "조건 대기 시간 초과"
+        time.sleep(0.01)
+
+
+def submit_payload(module, payload):
+    with module.app.test_client() as client:
+        return client.post('/api/evaluate-with-suggestions', json=payload).get_json()
+
+
+def run_test():
+    fake_server = start_fake_server()
+    cache_dir = tempfile.mkdtemp()
+    module = load_app(fake_server, os.path.join(cache_dir, 'llm_cache.sqlite3'))
+    client = module.app.test_client()
+
+    payload = {
+        "직무": "소프트웨어개발자",
+        "직위": "신입",
+        "qa_pairs": [
+            {"question": "지원동기를 기술해주십시오.", "answer": "사용자에게 도움이 되는 서비스를 만들고 싶어 지원했습니다."}
+        ]
+    }
+
+    print("\n=== [개선 제안 캐시 테스트] ===")
+    first = client.post('/api/evaluate-with-suggestions', json=payload).get_json()
+    second = client.post('/api/evaluate-with-suggestions', json=payload).get_json()
+    assert first['상세결과'][0]['캐시적중'] is False
+    assert second['상세결과'][0]['캐시적중'] is True
+    assert second['상세결과'][0]['개선제안'] == first['상세결과'][0]['개선제안']
+    assert fake_server.requests == 1
+    print(f"같은 요청 2회 -> upstream 호출 {fake_server.requests}회")
+
+    # 캐시 우회: 캐시를 읽지 않고 다시 호출
+    bypass = client.post('/api/evaluate-with-suggestions', json=dict(payload, no_cache=True)).get_json()
+    assert bypass['상세결과'][0]['캐시적중'] is False
+    bypass = client.post('/api/evaluate-with-suggestions', json=payload,
+                         headers={'Cache-Control': 'no-cache'}).get_json()
+    assert bypass['상세결과'][0]['캐시적중'] is False
+    assert fake_server.requests == 3
+    print(f"캐시 우회 2회 -> upstream 호출 {fake_server.requests}회")
+
+    # 다른 답변은 다른 키
+    other = dict(payload, qa_pairs=[{"question": "지원동기를 기술해주십시오.", "answer": "다른 답변입니다."}])
+    assert client.post('/api/evaluate-with-suggestions', json=other).get_json()['상세결과'][0]['캐시적중'] is False
+
+    # 같은 캐시 파일을 여는 다른 인스턴스(다른 워커 프로세스와 같은 상황)에서도 적중
+    from llm_cache import ResponseCache
+    shared = ResponseCache(module.response_cache.path)
+    key = module.prompt_key(module.MODEL, [
+        {"role": "system", "content": module.SYSTEM_PROMPT},
+        {"role": "user", "content": "공유 확인"}
+    ], **module.COMPLETION_PARAMS)
+    module.response_cache.put(key, "공유된 응답")
+    assert shared.get(key) == "공유된 응답"
+
+    # TTL 만료와 크기 제한
+    expiring = ResponseCache(os.path.join(cache_dir, 'ttl.sqlite3'), ttl=0.0)
+    expiring.put('a', 'x')
+    assert expiring.get('a') is None
+    bounded = ResponseCache(os.path.join(cache_dir, 'bounded.sqlite3'), max_entries=2)
+    for key in ('a', 'b', 'c'):
+        bounded.put(key, key)
+    assert bounded.get('a') is None and bounded.get('c') == 'c'
+    assert bounded.stats()['entries'] == 2
+
+    print("\n=== [문항 동시 평가 테스트] ===")
+    # 네 문항 모두 서버에 도착할 때까지 응답을 보류 (순차 호출이면 첫 문항에서 멈춤)
+    fake_server.max_in_flight = 0
+    released = threading.Event()
+    fake_server.held_prompts = {"동시 평가 답변": released}
+    questions = [{"question": f"질문 {i}", "answer": f"동시 평가 답변 {i}"} for i in range(4)]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(submit_payload, module, dict(payload, qa_pairs=questions))
+        wait_until(lambda: fake_server.in_flight == 4)
+        released.set()
+        result = pending.result()
+    fake_server.held_prompts = {}
+    assert [detail['질문번호'] for detail in result['상세결과']] == [1, 2, 3, 4]
+    assert [detail['질문'] for detail in result['상세결과']] == [qa['question'] for qa in questions]
+    scores = [detail['종합점수'] for detail in result['상세결과']]
+    assert scores == [module.parse_score(fake_reply([
+        {"role": "user", "content": module.build_prompt("소프트웨어개발자", "신입", qa)}]))
+                      for qa in questions]
+    assert result['평균점수'] == round(sum(scores) / len(scores), 1)
+    assert fake_server.max_in_flight == 4
+    print(f"4문항 -> 최대 동시 호출 {fake_server.max_in_flight}")
+
+    # 응답하지 않는 문항 하나만 시간 초과, 나머지는 순서대로 결과 유지
+    module.QUESTION_TIMEOUT = 1.0
+    stuck = threading.Event()
+    fake_server.held_prompts = {"느린 답변": stuck}
+    questions = [{"question": "빠른 질문", "answer": "빠른 답변"}, {"question": "느린 질문", "answer": "느린 답변"},
+                 {"question": "빠른 질문 2", "answer": "빠른 답변 2"}]
+    result = client.post('/api/evaluate-with-suggestions', json=dict(payload, qa_pairs=questions)).get_json()
+    stuck.set()
+    fake_server.held_prompts = {}
+    details = result['상세결과']
+    assert 'error' in details[1] and '종합점수' not in details[1]
+    assert '종합점수' in details[0] and '종합점수' in details[2]
+    assert result['평균점수'] == round((details[0]['종합점수'] + details[2]['종합점수']) / 2, 1)
+    print(f"느린 문항 시간 초과 -> {details[1]['error']}")
+
+    # 스레드 풀이 모두 사용 중이어도 제한 시간은 각 문항이 실행을 시작한 시점부터 계산
+    # (풀의 유일한 스레드를 제한 시간보다 오래 막아 두었다가 풀어 줌)
+    shared_executor = module.question_executor
+    module.question_executor = ThreadPoolExecutor(max_workers=1)
+    busy = threading.Event()
+    module.question_executor.submit(busy.wait)
+    questions = [{"question": f"대기 질문 {i}", "answer": f"대기 답변 {i}"} for i in range(3)]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(submit_payload, module, dict(payload, qa_pairs=questions))
+        time.sleep(module.QUESTION_TIMEOUT * 1.5)
+        busy.set()
+        result = pending.result()
+    assert all('error' not in detail for detail in result['상세결과'])
+    module.question_executor.shutdown()
+    module.question_executor = shared_executor
+    print("풀 대기 후 실행된 문항 -> 대기 시간은 제한 시간에 포함하지 않음")
+
+    # 문항 수 제한
+    too_many = [{"question": f"질문 {i}", "answer": "답변"} for i in range(module.MAX_QUESTIONS + 1)]
+    response = client.post('/api/evaluate-with-suggestions', json=dict(payload, qa_pairs=too_many))
+    assert response.status_code == 400
+    response = client.post('/api/evaluate-with-suggestions/stream', json=dict(payload, qa_pairs=too_many))
+    assert response.status_code == 400
+
+    assert module.parse_score("4. 종합 점수 (0~100점 사이 숫자로만)\n78점") == 78
+    assert module.parse_score("점수 없음") is None
+
+    print("\n=== [스트리밍 테스트] ===")
+    module.QUESTION_TIMEOUT = 30.0
+    questions = [{"question": "스트리밍 질문 1", "answer": "스트리밍 답변 1"},
+                 {"question": "스트리밍 질문 2", "answer": "스트리밍 답변 2"}]
+    stream_payload = dict(payload, qa_pairs=questions)
+    upstream_before = fake_server.stream_requests
+    # upstream이 첫 조각만 보내고 멈춘 상태에서도 delta 이벤트가 먼저 도착해야 함
+    fake_server.stream_gate = threading.Event()
+    response = client.post('/api/evaluate-with-suggestions/stream', json=stream_payload, buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    stream = iter_events(response.response)
+    events = [next(stream)]
+    assert events[0][0] == 'delta'
+    fake_server.stream_gate.set()
+    fake_server.stream_gate = None
+    events.extend(stream)
+    assert events[-1][0] == 'done'
+    result = events[-1][1]
+    for detail in result['상세결과']:
+        streamed = ''.join(data['delta'] for name, data in events
+                           if name == 'delta' and data['질문번호'] == detail['질문번호'])
+        assert streamed == detail['개선제안'] and detail['캐시적중'] is False
+        assert detail['종합점수'] == module.parse_score(streamed)
+    assert sorted(data['질문번호'] for name, data in events if name == 'question') == [1, 2]
+    assert fake_server.stream_requests - upstream_before == 2
+    print(f"upstream 완료 전 첫 delta 도착, delta 이벤트 {sum(1 for name, _ in events if name == 'delta')}개")
+
+    # 스트리밍으로 모은 본문은 캐시에 저장되어 일반/스트리밍 요청 모두 적중
+    cached = read_events(client.post('/api/evaluate-with-suggestions/stream', json=stream_payload, buffered=False))
+    assert [detail['캐시적중'] for detail in cached[-1][1]['상세결과']] == [True, True]
+    assert cached[-1][1]['상세결과'] == [dict(detail, 캐시적중=True) for detail in result['상세결과']]
+    plain = client.post('/api/evaluate-with-suggestions', json=stream_payload).get_json()
+    assert plain['상세결과'] == cached[-1][1]['상세결과']
+    assert fake_server.stream_requests - upstream_before == 2
+    print("같은 요청 재전송 -> 스트리밍/일반 모두 캐시 적중")
+
+    # 클라이언트가 중간에 끊으면 upstream 스트림도 중단 (불완전한 본문은 캐시하지 않음)
+    fake_server.stream_gate = threading.Event()
+    aborted_payload = dict(payload, qa_pairs=[{"question": "중단 질문", "answer": "중단 답변"}])
+    response = client.post('/api/evaluate-with-suggestions/stream', json=aborted_payload, buffered=False)
+    next(iter(response.response))
+    response.close()
+    fake_server.stream_gate.set()
+    fake_server.stream_gate = None
+    wait_until(lambda: fake_server.in_flight == 0)
+    again = read_events(client.post('/api/evaluate-with-suggestions/stream', json=aborted_payload, buffered=False))
+    assert again[-1][1]['상세결과'][0]['캐시적중'] is False
+    print("연결 종료 -> upstream 스트림 중단, 캐시 저장 안 함")
+
+    print("\n=== [동일 요청 합치기 테스트] ===")
+    # 첫 호출의 응답을 보류한 채 나머지 4개가 모두 합쳐질 때까지 기다린 뒤 응답
+    released = threading.Event()
+    fake_server.held_prompts = {"중복 클릭 답변": released}
+    burst_payload = dict(payload, qa_pairs=[{"question": "중복 클릭 질문", "answer": "중복 클릭 답변"}])
+    before = client.get('/api/stats').get_json()['single_flight']
+    upstream_before = fake_server.requests
+
+    def coalesced():
+        return client.get('/api/stats').get_json()['single_flight']['coalesced'] - before['coalesced']
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        pending = [pool.submit(submit_payload, module, burst_payload) for _ in range(5)]
+        wait_until(lambda: coalesced() == 4)
+        released.set()
+        results = [future.result() for future in pending]
+    fake_server.held_prompts = {}
+    after = client.get('/api/stats').get_json()['single_flight']
+    assert fake_server.requests - upstream_before == 1
+    assert len({result['상세결과'][0]['개선제안'] for result in results}) == 1
+    assert not any(result['상세결과'][0]['캐시적중'] for result in results)
+    assert after['upstream'] - before['upstream'] == 1
+    assert after['coalesced'] - before['coalesced'] == 4
+    assert after['in_flight'] == 0
+    print(f"동시 요청 5개 -> upstream 호출 1회, 합쳐진 호출 {after['coalesced'] - before['coalesced']}개")
+
+    # 먼저 시작한 스트리밍 호출이 연결 종료로 중단되어도 기다리던 호출은 다시 요청해서 결과를 받음
+    fake_server.stream_gate = threading.Event()
+    shared_payload = dict(payload, qa_pairs=[{"question": "공유 질문", "answer": "공유 답변"}])
+    before = client.get('/api/stats').get_json()['single_flight']
+    response = client.post('/api/evaluate-with-suggestions/stream', json=shared_payload, buffered=False)
+    next(iter(response.response))
+    follower = {}
+    waiting = threading.Thread(target=lambda: follower.update(submit_payload(module, shared_payload)))
+    waiting.start()
+    wait_until(lambda: coalesced() == 1)
+    response.close()
+    fake_server.stream_gate.set()
+    fake_server.stream_gate = None
+    waiting.join(timeout=10)
+    assert follower['상세결과'][0]['종합점수'] is not None and 'error' not in follower['상세결과'][0]
+    after = client.get('/api/stats').get_json()['single_flight']
+    assert after['upstream'] - before['upstream'] == 2 and after['coalesced'] - before['coalesced'] == 1
+    print("선두 스트림 중단 -> 대기 중이던 호출이 다시 요청해 결과 수신")
+
+    # 결과를 알리는 시점에는 키가 이미 내려가 있어서 재시도하는 대기자가 끝난 호출에 다시 붙지 않음
+    from single_flight import SingleFlight
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    registered_on_resolve = []
+
+    def interrupted():
+        registered_on_resolve.append(None)
+        future = flight._calls['키']
+        future.add_done_callback(lambda _: registered_on_resolve.append('키' in flight._calls))
+        started.set()
+        release.wait(timeout=10)
+        raise ConnectionError('선두 중단')
+
+    def leader():
+        try:
+            flight.do('키', interrupted, retry_on=(ConnectionError,))
+        except ConnectionError:
+            pass
+
+    leading = threading.Thread(target=leader)
+    leading.start()
+    started.wait(timeout=10)
+    retried = {}
+    waiting = threading.Thread(target=lambda: retried.update(
+        result=flight.do('키', lambda: '재시도 결과', retry_on=(ConnectionError,))))
+    waiting.start()
+    while flight.stats()['coalesced'] == 0:
+        time.sleep(0.01)
+    release.set()
+    leading.join(timeout=10)
+    waiting.join(timeout=10)
+    assert registered_on_resolve == [None, False]
+    assert retried['result'] == ('재시도 결과', False)
+    assert flight.stats() == {'in_flight': 0, 'upstream': 2, 'coalesced': 1}
+    print("선두 호출 중단 -> 키를 먼저 내리고 결과 전달, 대기자는 한 번만 재시도")
+
+    print("\n=== [호출 예산 스케줄러 테스트] ===")
+    # 1초당 요청 3개로 줄인 서버와 같은 예산의 스케줄러 -> 문항 6개가 429 없이 나눠서 전송됨
+    fake_server.limit(rpm=3, window=1.0)
+    module.scheduler = module.TokenBudgetScheduler(rpm=3, tpm=10 ** 6, window=1.0, margin=0.1, base_delay=0.1)
+    budget_payload = dict(payload, qa_pairs=[{"question": f"예산 질문 {i}", "answer": "예산 답변"} for i in range(6)])
+    result = client.post('/api/evaluate-with-suggestions', json=budget_payload).get_json()
+    stats = client.get('/api/stats').get_json()['scheduler']
+    assert all('error' not in detail for detail in result['상세결과'])
+    # 예산이 3개뿐이므로 일부 호출은 반드시 예산을 기다렸다가 전송됨
+    assert fake_server.throttled == 0 and stats['upstream_calls'] == 6 and stats['queue_wait_max_s'] > 0
+    print(f"문항 6개 -> 429 없음, 최대 대기 {stats['queue_wait_max_s']}초")
+
+    # 예산을 서버 한도보다 크게 잡아도 429는 Retry-After만큼 쉬었다가 재시도해서 성공
+    time.sleep(1.2)
+    fake_server.limit(rpm=2, window=1.0)
+    module.scheduler = module.TokenBudgetScheduler(rpm=6, tpm=10 ** 6, window=1.0, margin=0.1, base_delay=0.1)
+    retry_payload = dict(payload, qa_pairs=[{"question": f"재시도 질문 {i}", "answer": "재시도 답변"} for i in range(4)])
+    result = client.post('/api/evaluate-with-suggestions', json=retry_payload).get_json()
+    stats = client.get('/api/stats').get_json()['scheduler']
+    assert all('error' not in detail for detail in result['상세결과'])
+    assert stats['rate_limited'] > 0 and stats['retries'] == stats['rate_limited'] and stats['failures'] == 0
+    fake_server.limit()
+    print(f"서버 한도 초과 -> 429 {stats['rate_limited']}회 재시도 후 모두 성공")
+
+    # 문항 함수가 직접 TimeoutError를 던져도 기다리지 않고 그 예외가 그대로 전달됨
+    def raise_timeout(deadline):
+        raise TimeoutError('문항 자체 시간 초과')
+    outcome = []
+    def wait_result():
+        try:
+            module.QuestionTask(raise_timeout).result()
+        except TimeoutError as e:
+            outcome.append(str(e))
+    waiter = threading.Thread(target=wait_result, daemon=True)
+    waiter.start()
+    waiter.join(timeout=5)
+    assert outcome == ['문항 자체 시간 초과'], outcome
+    print("문항 예외 TimeoutError -> 그대로 전달")
+
+    print(f"\n캐시 통계: {client.get('/api/stats').get_json()['cache']}")
+    print("=== [테스트 통과] ===")
+    fake_server.shutdown()
+
+
+if __name__ == "__main__":
+    run_test()
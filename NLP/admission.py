@@ -0,0 +1,129 @@
+# admission.py
+"""
+평가 요청 수락 제어 (동시 처리 수 제한 + 대기열 + 요청별 마감 시간)
+
+- 동시에 max_concurrency개까지만 평가하고, 나머지는 최대 max_queue개까지 도착 순서대로 대기
+- 대기열이 가득 찼거나 queue_timeout(또는 요청 마감 시간) 안에 차례가 오지 않으면 Overloaded
+  -> 라우트에서 503 + Retry-After로 즉시 응답
+- 평가 중 마감 시간이 지나면 남은 문항은 계산하지 않고 DeadlineExceeded
+
+제한은 프로세스 단위이므로 pre-fork 모드에서는 워커마다 적용됩니다.
+"""
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """대기열이 가득 찼거나 대기 시간이 초과되어 요청을 받지 않음"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after   # 초 (Retry-After 헤더 값)
+
+
+class DeadlineExceeded(Exception):
+    """요청 마감 시간 초과로 평가 중단"""
+
+
+def check_deadline(deadline):
+    """마감 시간(time.monotonic 기준)이 지났으면 DeadlineExceeded"""
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded('요청 처리 시간 초과')
+
+
+class AdmissionController:
+    """동시 처리 슬롯과 FIFO 대기열"""
+
+    def __init__(self, max_concurrency=4, max_queue=64, queue_timeout=10.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_queue_timeout = 0
+        self.deadline_exceeded = 0
+        self._service_time = None   # 처리 시간 지수 이동 평균 (Retry-After 추정용)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_concurrency=int(os.environ.get('EVALUATE_CONCURRENCY', os.cpu_count() or 1)),
+            max_queue=int(os.environ.get('EVALUATE_QUEUE_SIZE', 64)),
+            queue_timeout=float(os.environ.get('EVALUATE_QUEUE_TIMEOUT', 10.0))
+        )
+
+    def retry_after(self):
+        """현재 대기열이 빠지는 데 걸릴 예상 시간 (초, 최소 1)"""
+        service_time = self._service_time or 1.0
+        return max(1, math.ceil((self.queued + 1) * service_time / self.max_concurrency))
+
+    def acquire(self, deadline=None):
+        """슬롯을 얻을 때까지 대기 (대기열이 가득 찼거나 시간 초과면 Overloaded)"""
+        with self._cond:
+            # 대기 중인 요청이 있으면 새 요청이 끼어들지 않도록 대기열 뒤에 줄 세움
+            if self.in_flight < self.max_concurrency and self.queued == 0:
+                self.in_flight += 1
+                self.admitted += 1
+                return
+            if self.queued >= self.max_queue:
+                self.rejected_queue_full += 1
+                raise Overloaded('평가 대기열이 가득 찼습니다', self.retry_after())
+
+            wait_until = time.monotonic() + self.queue_timeout
+            if deadline is not None:
+                wait_until = min(wait_until, deadline)
+            self.queued += 1
+            try:
+                while self.in_flight >= self.max_concurrency:
+                    remaining = wait_until - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected_queue_timeout += 1
+                        raise Overloaded('평가 대기 시간이 초과되었습니다', self.retry_after())
+                    self._cond.wait(remaining)
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            self.admitted += 1
+
+    def release(self, elapsed=None, deadline_exceeded=False):
+        with self._cond:
+            self.in_flight -= 1
+            if deadline_exceeded:
+                self.deadline_exceeded += 1
+            if elapsed is not None:
+                self._service_time = elapsed if self._service_time is None else \
+                    0.8 * self._service_time + 0.2 * elapsed
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self, deadline=None):
+        """with 블록 동안 슬롯 하나 점유"""
+        self.acquire(deadline)
+        start = time.monotonic()
+        exceeded = False
+        try:
+            yield
+        except DeadlineExceeded:
+            exceeded = True
+            raise
+        finally:
+            self.release(time.monotonic() - start, exceeded)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'in_flight': self.in_flight,
+                'queued': self.queued,
+                'admitted': self.admitted,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_queue_timeout': self.rejected_queue_timeout,
+                'deadline_exceeded': self.deadline_exceeded
+            }
@@ -0,0 +1,704 @@
+# benchmark.py
+"""
+자소서 평가 서버 부하/지연 시간 벤치마크
+
+합격 자소서 엑셀(data/잡코리아_합격자소서.xlsx)과 링커리어 수집 결과(data/linked_scraping_result.csv)의
+실제 질문/답변으로 합성 자소서를 만들어 /evaluate를 호출하고, 처리량과 p50/p95/p99 지연 시간을 JSON으로 출력합니다.
+
+    python benchmark.py http --mode inprocess --concurrency 8 --requests 300 --output before.json
+    python benchmark.py http --mode socket --concurrency 16                 # 로컬 소켓으로 werkzeug 서버 실행
+    python benchmark.py http --mode socket --url http://127.0.0.1:5002      # 이미 떠 있는 서버 (server.py 등)
+    python benchmark.py compare before.json after.json
+
+같은 --seed/--resumes/--requests로 실행하면 같은 요청 순서가 재현되므로 커밋 간 결과를 비교할 수 있습니다.
+결과 캐시 적중을 빼고 재려면 --no-result-cache를 사용합니다 (inprocess/내장 socket 서버만 해당).
+
+점수 함수 최적화 검증 (word_based_similarity, get_category, 키워드/비전 점수, 참조 질문 매칭)
+
+    python benchmark.py golden record      # 고정 코퍼스의 현재 출력을 data/score_golden.json에 기록
+    python benchmark.py golden record --at e1d58ce7 --answers 2000 --golden data/score_golden_baseline.json
+                                           # 전체 답변에 대한 해당 커밋(최적화 전 baseline) 코드의 출력을 기록
+    python benchmark.py golden check       # 현재 코드의 출력이 두 기록과 같은지 확인 (다르면 종료 코드 1)
+    python benchmark.py micro              # 함수별 ops/sec와 tracemalloc 메모리 할당량
+
+골든 파일에는 입력(질문/답변/키워드)도 함께 저장되므로 데이터 파일이 바뀌어도 같은 입력으로 비교합니다.
+baseline 골든은 최적화 이전 코드(git archive로 꺼낸 트리)를 별도 프로세스에서 실행해 기록하므로
+이후 커밋의 최적화가 원래 점수를 바꾸지 않았는지 확인할 수 있습니다. 의도한 차이는 골든 파일의
+known_differences에 {함수: {케이스 번호: {"actual": 현재 출력, "reason": 이유}}}로 기록합니다.
+
+콜드 스타트 측정 (새 프로세스에서 import / 평가기 초기화 시간, import 시간 상위 모듈)
+
+    python benchmark.py startup --runs 3
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ESSAY_XLSX_PATH = os.path.join(BASE_DIR, 'data', '잡코리아_합격자소서.xlsx')
+LINKED_CSV_PATH = os.path.join(BASE_DIR, 'data', 'linked_scraping_result.csv')
+GOLDEN_PATH = os.path.join(BASE_DIR, 'data', 'score_golden.json')
+BASELINE_GOLDEN_PATH = os.path.join(BASE_DIR, 'data', 'score_golden_baseline.json')
+SCORE_FUNCTIONS = ('get_category', 'word_based_similarity', 'keyword_score', 'vision_score', 'best_match')
+
+
+def _text(value):
+    return '' if pd.isna(value) else str(value).strip()
+
+
+def load_resumes(xlsx_path=ESSAY_XLSX_PATH, linked_csv_path=LINKED_CSV_PATH):
+    """두 데이터셋의 자소서 단위 (회사명, 직무, 직위, qa_pairs) 목록"""
+    resumes = []
+
+    df = pd.read_excel(xlsx_path, engine='openpyxl')
+    for _, group in df.groupby('Essay_ID', sort=True):
+        first = group.iloc[0]
+        qa_pairs = [{'question': _text(q), 'answer': _text(a)}
+                    for q, a in zip(group['질문'], group['답변']) if _text(a)]
+        if qa_pairs:
+            resumes.append({'회사명': _text(first['회사명']), '직무': _text(first['직무']),
+                            '직위': _text(first['직위']) or '신입', 'qa_pairs': qa_pairs})
+
+    if linked_csv_path and os.path.exists(linked_csv_path):
+        df = pd.read_csv(linked_csv_path)
+        for _, group in df.groupby(['회사명', '연도', '직무명'], sort=True):
+            first = group.iloc[0]
+            qa_pairs = [{'question': _text(q), 'answer': _text(a)}
+                        for q, a in zip(group['질문 내용'], group['답변']) if _text(a)]
+            if qa_pairs:
+                resumes.append({'회사명': _text(first['회사명']), '직무': _text(first['직무명']),
+                                '직위': _text(first['경력']) or '신입', 'qa_pairs': qa_pairs})
+    return resumes
+
+
+def synthesize_resumes(resumes, count, seed=42, max_questions=8):
+    """
+    실제 자소서를 섞어 합성 자소서 count개 생성
+    (같은 직무의 다른 합격 답변을 섞어 문항 수 2~max_questions개로 구성, seed가 같으면 같은 결과)
+    """
+    rng = random.Random(seed)
+    by_job = {}
+    for resume in resumes:
+        by_job.setdefault(resume['직무'], []).append(resume)
+
+    synthetic = []
+    for _ in range(count):
+        base = rng.choice(resumes)
+        pool = [qa for other in by_job[base['직무']] for qa in other['qa_pairs']]
+        size = min(len(pool), rng.randint(2, max_questions))
+        synthetic.append({
+            '회사명': base['회사명'],
+            '직무': base['직무'],
+            '직위': base['직위'],
+            'qa_pairs': rng.sample(pool, size)
+        })
+    return synthetic
+
+
+def percentile(sorted_values, pct):
+    """정렬된 값의 nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, errors, duration):
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    ms = lambda value: None if value is None else round(value * 1000, 3)
+    return {
+        'requests': total,
+        'errors': errors,
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(latencies) / duration, 2) if duration > 0 else None,
+        'latency_ms': {
+            'mean': ms(sum(latencies) / len(latencies)) if latencies else None,
+            'p50': ms(percentile(latencies, 50)),
+            'p95': ms(percentile(latencies, 95)),
+            'p99': ms(percentile(latencies, 99)),
+            'max': ms(latencies[-1]) if latencies else None
+        }
+    }
+
+
+def run_load(send, payloads, concurrency):
+    """payloads를 concurrency개 스레드로 나눠 보내고 요청별 지연 시간 수집 (send(body) -> 성공 여부)"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    cursor = iter(range(len(payloads)))
+
+    def worker():
+        nonlocal errors
+        local_latencies = []
+        local_errors = 0
+        while True:
+            with lock:
+                index = next(cursor, None)
+            if index is None:
+                break
+            start = time.perf_counter()
+            try:
+                ok = send(payloads[index])
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            if ok:
+                local_latencies.append(elapsed)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def inprocess_sender(app, path):
+    """Flask 테스트 클라이언트로 요청 (스레드마다 클라이언트 하나)"""
+    local = threading.local()
+
+    def send(body):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        response = client.post(path, data=body, content_type='application/json')
+        return response.status_code == 200
+    return send
+
+
+def socket_sender(url, path):
+    """HTTP 소켓으로 요청 (서버가 keep-alive를 지원하면 스레드마다 연결 재사용)"""
+    parts = urlsplit(url)
+    local = threading.local()
+    headers = {'Content-Type': 'application/json'}
+
+    def send(body):
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+        try:
+            conn.request('POST', path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            local.conn = None
+            raise
+        if response.will_close:
+            conn.close()
+            local.conn = None
+        return response.status == 200
+    return send
+
+
+def start_local_server(app):
+    """127.0.0.1의 빈 포트에 werkzeug 서버를 띄우고 (서버, URL) 반환"""
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='benchmark-server', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def http_benchmark(args):
+    resumes = load_resumes()
+    corpus = synthesize_resumes(resumes, args.resumes, args.seed, args.max_questions)
+    rng = random.Random(args.seed)
+    payloads = [json.dumps(rng.choice(corpus), ensure_ascii=False).encode('utf-8') for _ in range(args.requests)]
+    warmup = [json.dumps(resume, ensure_ascii=False).encode('utf-8') for resume in corpus[:args.warmup]]
+
+    server = None
+    if args.mode == 'socket' and args.url:
+        url = args.url.rstrip('/')
+        send = socket_sender(url, args.path)
+    else:
+        import resume_evaluator
+        evaluator = resume_evaluator.get_evaluator()
+        if args.no_result_cache:
+            evaluator.result_cache.maxsize = 0
+            evaluator.result_cache.clear()
+        if args.mode == 'socket':
+            server, url = start_local_server(resume_evaluator.app)
+            send = socket_sender(url, args.path)
+        else:
+            url = None
+            send = inprocess_sender(resume_evaluator.app, args.path)
+
+    try:
+        for body in warmup:
+            send(body)
+        result = run_load(send, payloads, args.concurrency)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    report = {
+        'benchmark': 'http',
+        'mode': args.mode,
+        'path': args.path,
+        'url': url,
+        'concurrency': args.concurrency,
+        'result_cache': not args.no_result_cache,
+        'corpus': {
+            'source_resumes': len(resumes),
+            'resumes': len(corpus),
+            'questions': sum(len(r['qa_pairs']) for r in corpus),
+            'seed': args.seed
+        },
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+    report.update(result)
+    return report
+
+
+def compare(args):
+    """두 결과 JSON의 처리량/지연 시간 비교 (변화율 %)"""
+    with open(args.before, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(args.after, encoding='utf-8') as f:
+        after = json.load(f)
+
+    def change(old, new):
+        if old in (None, 0) or new is None:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    rows = {'throughput_rps': change(before.get('throughput_rps'), after.get('throughput_rps'))}
+    for key in ('mean', 'p50', 'p95', 'p99', 'max'):
+        rows[f'latency_{key}_ms'] = change(before['latency_ms'].get(key), after['latency_ms'].get(key))
+    return {
+        'before': {'commit': before.get('commit'), 'throughput_rps': before.get('throughput_rps'),
+                   'latency_ms': before.get('latency_ms')},
+        'after': {'commit': after.get('commit'), 'throughput_rps': after.get('throughput_rps'),
+                  'latency_ms': after.get('latency_ms')},
+        'change_pct': rows
+    }
+
+
+def build_score_corpus(evaluator, seed=42, questions=200, answers=100):
+    """점수 함수 검증용 고정 입력 (질문, 답변, 비교 대상 핵심단어/답변 키워드/회사명, 매칭할 직무/직위)"""
+    rng = random.Random(seed)
+    resumes = load_resumes()
+    all_questions = sorted({qa['question'] for r in resumes for qa in r['qa_pairs'] if qa['question']})
+    all_answers = sorted({(r['직무'], qa['answer']) for r in resumes for qa in r['qa_pairs']})
+    entries = [entry for entry in evaluator.reference_index.entries if entry.keyword is not None]
+    keywords = sorted({entry.keyword for entry in entries})
+    companies = sorted(evaluator.company_info_map) + ['없는회사']
+
+    sampled_questions = rng.sample(all_questions, min(questions, len(all_questions)))
+    sampled_answers = rng.sample(all_answers, min(answers, len(all_answers)))
+    by_job = {}
+    for entry in entries:
+        if entry.answer_keywords is not None:
+            by_job.setdefault(entry.job_title, []).append(entry)
+    with_keywords = [entry for group in by_job.values() for entry in group]
+
+    cases = {
+        'get_category': [[i] for i in range(len(sampled_questions))],
+        'word_based_similarity': [[i, rng.choice(keywords if rng.random() < 0.7 else sampled_questions)]
+                                  for i in range(len(sampled_questions))],
+        'keyword_score': [],
+        'vision_score': [],
+        'best_match': []
+    }
+    for i, (job_title, _) in enumerate(sampled_answers):
+        entry = rng.choice(by_job.get(job_title) or with_keywords)
+        cases['keyword_score'].append([i, entry['답변키워드_TOP20']])
+        cases['vision_score'].append([i, rng.choice(companies)])
+    # 참조 질문 매칭: 직무+직위 -> 직무 -> 전체 단계가 모두 나오도록 없는 직위/직무도 섞음
+    positions = sorted({entry.position for entry in entries})
+    for i in range(len(sampled_questions)):
+        entry = rng.choice(entries)
+        position = entry.position if rng.random() < 0.7 else rng.choice(positions + ['없는직위'])
+        job_title = entry.job_title if rng.random() < 0.9 else '없는직무'
+        cases['best_match'].append([i, job_title, position])
+    return {
+        'seed': seed,
+        'questions': sampled_questions,
+        'answers': [answer for _, answer in sampled_answers],
+        'cases': cases
+    }
+
+
+def score_calls(evaluator, corpus, analyzed=False):
+    """
+    함수 이름 -> 각 케이스를 실행하는 인자 없는 호출 목록
+    analyzed: 키워드/비전 점수에 미리 분석한 AnalyzedDocument를 넘김 (evaluate_resume 경로, Kiwi 분석 시간 제외)
+    """
+    questions = corpus['questions']
+    answers = corpus['answers']
+    if analyzed:
+        documents = evaluator.analyze_many(answers)
+        answers = [documents[answer] for answer in answers]
+    cases = corpus['cases']
+    return {
+        'get_category': [lambda q=questions[i]: evaluator.get_category(q)
+                         for i, in cases['get_category']],
+        'word_based_similarity': [lambda q=questions[i], other=other: evaluator.word_based_similarity(q, other)
+                                  for i, other in cases['word_based_similarity']],
+        'keyword_score': [lambda a=answers[i], kw=kw: evaluator.calculate_keyword_matching_score(a, kw)
+                          for i, kw in cases['keyword_score']],
+        'vision_score': [lambda a=answers[i], co=co: evaluator.calculate_vision_alignment_score(a, co)
+                         for i, co in cases['vision_score']],
+        'best_match': [lambda q=questions[i], job=job, pos=pos: _best_match(evaluator, q, job, pos)
+                       for i, job, pos in cases['best_match']]
+    }
+
+
+def _best_match(evaluator, question, job_title, position):
+    """find_best_matching_question -> [핵심단어, 유사도, 답변키워드_TOP20]"""
+    keyword, similarity, entry = evaluator.find_best_matching_question(question, job_title, position)
+    return [keyword, similarity, None if entry is None else entry['답변키워드_TOP20']]
+
+
+def normalize_output(function, value):
+    """비교 가능한 JSON 값으로 변환 (매칭 키워드는 집합 교집합 결과라 순서 무관하게 정렬)"""
+    if function == 'keyword_score':
+        score, matched = value
+        return [score, sorted(matched)]
+    if function == 'vision_score':
+        score, matched = value
+        return [score, list(matched)]
+    if function == 'best_match':
+        # baseline은 pandas 행을 돌려주므로 핵심단어/답변 키워드 표기(공백)를 현재 색인과 같은 형태로 맞춤
+        keyword, similarity, answer_keywords = value
+        keyword = (str(keyword).strip() or None) if keyword is not None else None
+        if answer_keywords is not None:
+            answer_keywords = [kw.strip() for kw in str(answer_keywords).split(',')]
+        return [keyword, float(similarity), answer_keywords]
+    return value
+
+
+# 다른 커밋의 트리에서 실행하는 점수 계산 (그 시점에도 있던 공개 메서드만 사용, 표준 입력으로 코퍼스를 받음)
+COMMIT_SCORER = """
+import json, sys
+import pandas as pd
+from resume_evaluator import ResumeEvaluator
+corpus = json.load(sys.stdin)
+evaluator = ResumeEvaluator()
+questions, answers, cases = corpus['questions'], corpus['answers'], corpus['cases']
+outputs = {
+    'get_category': [evaluator.get_category(questions[i]) for i, in cases['get_category']],
+    'word_based_similarity': [evaluator.word_based_similarity(questions[i], other)
+                              for i, other in cases['word_based_similarity']],
+    'keyword_score': [list(evaluator.calculate_keyword_matching_score(answers[i], kw))
+                      for i, kw in cases['keyword_score']],
+    'vision_score': [list(evaluator.calculate_vision_alignment_score(answers[i], co))
+                     for i, co in cases['vision_score']],
+    'best_match': []
+}
+for i, job_title, position in cases['best_match']:
+    keyword, similarity, row = evaluator.find_best_matching_question(questions[i], job_title, position)
+    answer_keywords = None if row is None else row['답변키워드_TOP20']
+    outputs['best_match'].append([None if pd.isna(keyword) else keyword, float(similarity),
+                                  None if pd.isna(answer_keywords) else answer_keywords])
+sys.stdout.write('\\n' + json.dumps(outputs, ensure_ascii=False, default=list))
+"""
+
+
+def nltk_data_available():
+    """영문 답변 처리 결과가 NLTK 데이터 유무에 따라 달라지므로 골든 파일에 함께 기록"""
+    import nltk
+    try:
+        for resource in ('tokenizers/punkt', 'corpora/stopwords', 'taggers/averaged_perceptron_tagger'):
+            nltk.data.find(resource)
+    except LookupError:
+        return False
+    return True
+
+
+def score_at_commit(commit, corpus):
+    """git archive로 commit의 NLP 트리를 꺼내 별도 프로세스에서 코퍼스 점수 계산 -> 함수별 출력"""
+    import shutil
+    import tarfile
+    import tempfile
+    workdir = tempfile.mkdtemp(prefix='golden-')
+    try:
+        archive = subprocess.run(['git', 'archive', commit, '.'], cwd=BASE_DIR, capture_output=True, check=True)
+        archive_path = os.path.join(workdir, 'tree.tar')
+        with open(archive_path, 'wb') as f:
+            f.write(archive.stdout)
+        with tarfile.open(archive_path) as tar:
+            tar.extractall(workdir, filter='data')
+        inputs = {key: corpus[key] for key in ('questions', 'answers', 'cases')}
+        result = subprocess.run([sys.executable, '-c', COMMIT_SCORER], cwd=workdir, check=True,
+                                input=json.dumps(inputs, ensure_ascii=False), capture_output=True, text=True)
+        # 평가기 초기화 중 출력되는 로그 뒤 마지막 줄이 결과
+        outputs = json.loads(result.stdout.rsplit('\n', 1)[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {name: [normalize_output(name, value) for value in outputs[name]] for name in SCORE_FUNCTIONS}
+
+
+def check_golden(evaluator, path, show=5):
+    """골든 파일 하나를 현재 코드로 검증 (known_differences에 기록된 의도한 차이는 실패로 세지 않음)"""
+    with open(path, encoding='utf-8') as f:
+        corpus = json.load(f)
+    known = corpus.get('known_differences', {})
+    # 답변 문자열 입력과 미리 분석한 문서 입력 두 경로 모두 같은 결과여야 함
+    variants = [('text', score_calls(evaluator, corpus)), ('analyzed', score_calls(evaluator, corpus, analyzed=True))]
+    report = {'golden': path, 'recorded_at': corpus.get('commit'), 'nltk_data': corpus.get('nltk_data'),
+              'functions': {}}
+    ok = True
+    for name in SCORE_FUNCTIONS:
+        mismatches = []
+        expected_differences = 0
+        for variant, calls in variants:
+            if variant == 'analyzed' and name not in ('keyword_score', 'vision_score'):
+                continue
+            for index, (call, expected) in enumerate(zip(calls[name], corpus['outputs'][name])):
+                actual = json.loads(json.dumps(normalize_output(name, call()), ensure_ascii=False))
+                if actual == expected:
+                    continue
+                difference = known.get(name, {}).get(str(index))
+                if difference is not None and difference['actual'] == actual:
+                    expected_differences += 1
+                    continue
+                mismatches.append({'case': index, 'path': variant, 'expected': expected, 'actual': actual})
+        ok = ok and not mismatches
+        report['functions'][name] = {'cases': len(corpus['outputs'][name]), 'mismatches': len(mismatches),
+                                     'known_differences': expected_differences, 'examples': mismatches[:show]}
+    report['ok'] = ok
+    return report
+
+
+def golden(args):
+    import resume_evaluator
+    evaluator = resume_evaluator.get_evaluator()
+
+    if args.action == 'record':
+        if args.at:
+            # 입력은 --corpus 골든에서 가져오거나 현재 데이터로 새로 샘플링하고, 출력만 해당 커밋의 코드로 계산
+            if args.corpus:
+                with open(args.corpus, encoding='utf-8') as f:
+                    source = json.load(f)
+                corpus = {key: source[key] for key in ('seed', 'questions', 'answers', 'cases')}
+            else:
+                corpus = build_score_corpus(evaluator, args.seed, args.questions, args.answers)
+            corpus['outputs'] = score_at_commit(args.at, corpus)
+            corpus['commit'] = args.at
+            corpus['known_differences'] = {}
+        else:
+            corpus = build_score_corpus(evaluator, args.seed, args.questions, args.answers)
+            calls = score_calls(evaluator, corpus)
+            corpus['outputs'] = {name: [normalize_output(name, call()) for call in calls[name]]
+                                 for name in SCORE_FUNCTIONS}
+            corpus['commit'] = _git_commit()
+        corpus['nltk_data'] = nltk_data_available()
+        with open(args.golden, 'w', encoding='utf-8') as f:
+            json.dump(corpus, f, ensure_ascii=False, indent=0)
+        return {'recorded': args.golden, 'commit': corpus['commit'],
+                'cases': {name: len(corpus['outputs'][name]) for name in SCORE_FUNCTIONS}}
+
+    paths = [args.golden] + ([args.baseline] if args.baseline and os.path.exists(args.baseline) else [])
+    files = [check_golden(evaluator, path, args.show) for path in paths]
+    return {'commit': _git_commit(), 'nltk_data': nltk_data_available(), 'files': files,
+            'ok': all(report['ok'] for report in files)}
+
+
+def micro(args):
+    """골든 코퍼스로 함수별 처리량(ops/sec)과 한 바퀴 실행 중 메모리 할당량 측정"""
+    import tracemalloc
+    import resume_evaluator
+    from token_cache import token_cache
+    evaluator = resume_evaluator.get_evaluator()
+
+    if os.path.exists(args.golden):
+        with open(args.golden, encoding='utf-8') as f:
+            corpus = json.load(f)
+    else:
+        corpus = build_score_corpus(evaluator, args.seed, args.questions, args.answers)
+    calls = score_calls(evaluator, corpus, analyzed=not args.raw_text)
+
+    def run_pass(name):
+        if args.cold:
+            token_cache.clear()
+        for call in calls[name]:
+            call()
+
+    report = {'benchmark': 'micro', 'commit': _git_commit(), 'python': platform.python_version(),
+              'cold_token_cache': args.cold, 'raw_text': args.raw_text, 'functions': {}}
+    for name in SCORE_FUNCTIONS:
+        if args.only and name not in args.only:
+            continue
+        run_pass(name)   # 워밍업
+
+        passes = 0
+        start = time.perf_counter()
+        while True:
+            run_pass(name)
+            passes += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= args.min_time:
+                break
+
+        # 한 바퀴 동안의 최대 추가 메모리와 실행 후 남은 블록 (캐시 증가분 등)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base_size, _ = tracemalloc.get_traced_memory()
+        run_pass(name)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        diff = after.compare_to(before, 'filename')
+
+        ops = passes * len(calls[name])
+        report['functions'][name] = {
+            'cases': len(calls[name]),
+            'ops_per_sec': round(ops / elapsed, 1),
+            'us_per_op': round(elapsed / ops * 1e6, 2),
+            'peak_alloc_kb': round((peak - base_size) / 1024, 1),
+            'retained_blocks': sum(stat.count_diff for stat in diff),
+            'retained_kb': round(sum(stat.size_diff for stat in diff) / 1024, 1)
+        }
+    return report
+
+
+STARTUP_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import resume_evaluator
+imported = time.perf_counter()
+resume_evaluator.ResumeEvaluator()
+initialized = time.perf_counter()
+print(json.dumps({'import_s': imported - start, 'init_s': initialized - imported,
+                  'nltk_loaded': 'nltk' in sys.modules}))
+"""
+
+
+def startup(args):
+    """새 프로세스에서 resume_evaluator import/초기화 시간 측정 (-X importtime으로 모듈별 누적 시간 수집)"""
+    runs = []
+    modules = {}
+    for _ in range(args.runs):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT], cwd=BASE_DIR,
+                                   capture_output=True, text=True, timeout=600)
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            raise RuntimeError(completed.stderr[-2000:])
+        runs.append(json.loads(lines[-1]))
+
+        # "import time: self [us] | cumulative | module" 중 resume_evaluator가 직접 import한 모듈만 집계
+        # (모듈명 앞 공백 1칸: 최상위, 3칸: 한 단계 아래)
+        for line in completed.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if len(name) - len(name.lstrip(' ')) == 3:
+                modules.setdefault(name.strip(), []).append(int(cumulative) / 1e6)
+
+    median = lambda values: sorted(values)[len(values) // 2]
+    top = sorted(((name, median(values)) for name, values in modules.items()), key=lambda item: -item[1])
+    return {
+        'benchmark': 'startup',
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'runs': args.runs,
+        'import_s': round(median([run['import_s'] for run in runs]), 3),
+        'init_s': round(median([run['init_s'] for run in runs]), 3),
+        'nltk_loaded': any(run['nltk_loaded'] for run in runs),
+        'top_imports_s': {name: round(seconds, 3) for name, seconds in top[:args.top]}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="자소서 평가 서버 벤치마크")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    http_parser = sub.add_parser('http', help='/evaluate 부하 테스트')
+    http_parser.add_argument('--mode', choices=['inprocess', 'socket'], default='inprocess')
+    http_parser.add_argument('--url', help='socket 모드에서 호출할 서버 (미지정 시 로컬 서버를 직접 띄움)')
+    http_parser.add_argument('--path', default='/evaluate')
+    http_parser.add_argument('--concurrency', type=int, default=4)
+    http_parser.add_argument('--requests', type=int, default=200)
+    http_parser.add_argument('--resumes', type=int, default=100, help='합성 자소서 수 (요청은 이 중에서 반복 선택)')
+    http_parser.add_argument('--max-questions', type=int, default=8)
+    http_parser.add_argument('--warmup', type=int, default=5)
+    http_parser.add_argument('--seed', type=int, default=42)
+    http_parser.add_argument('--no-result-cache', action='store_true', help='문항 결과 캐시 비활성화')
+    http_parser.add_argument('--output', help='결과 JSON 저장 경로')
+
+    compare_parser = sub.add_parser('compare', help='두 결과 JSON 비교')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+
+    golden_parser = sub.add_parser('golden', help='점수 함수 골든 출력 기록/검증')
+    golden_parser.add_argument('action', choices=['record', 'check'])
+    golden_parser.add_argument('--golden', default=GOLDEN_PATH)
+    golden_parser.add_argument('--baseline', default=BASELINE_GOLDEN_PATH,
+                               help='check 시 함께 검증할 baseline 골든 (빈 값이면 생략)')
+    golden_parser.add_argument('--at', help='record: 이 커밋의 코드로 출력 기록')
+    golden_parser.add_argument('--corpus', help='--at 기록에 사용할 입력 코퍼스 골든 (없으면 새로 샘플링)')
+    golden_parser.add_argument('--seed', type=int, default=42)
+    golden_parser.add_argument('--questions', type=int, default=200)
+    golden_parser.add_argument('--answers', type=int, default=100)
+    golden_parser.add_argument('--show', type=int, default=5, help='함수별로 출력할 불일치 예시 수')
+
+    micro_parser = sub.add_parser('micro', help='점수 함수 마이크로 벤치마크')
+    micro_parser.add_argument('--golden', default=GOLDEN_PATH, help='입력 코퍼스 (없으면 새로 생성)')
+    micro_parser.add_argument('--seed', type=int, default=42)
+    micro_parser.add_argument('--questions', type=int, default=200)
+    micro_parser.add_argument('--answers', type=int, default=100)
+    micro_parser.add_argument('--min-time', type=float, default=1.0, help='함수별 최소 측정 시간 (초)')
+    micro_parser.add_argument('--only', nargs='*', choices=SCORE_FUNCTIONS)
+    micro_parser.add_argument('--cold', action='store_true', help='매 바퀴 형태소 캐시를 비우고 측정')
+    micro_parser.add_argument('--raw-text', action='store_true',
+                              help='키워드/비전 점수에 답변 문자열을 넘겨 Kiwi 분석 시간까지 포함')
+    micro_parser.add_argument('--output', help='결과 JSON 저장 경로')
+
+    startup_parser = sub.add_parser('startup', help='콜드 스타트 import/초기화 시간')
+    startup_parser.add_argument('--runs', type=int, default=3)
+    startup_parser.add_argument('--top', type=int, default=10, help='출력할 import 시간 상위 모듈 수')
+    startup_parser.add_argument('--output', help='결과 JSON 저장 경로')
+
+    args = parser.parse_args()
+    if args.command == 'http':
+        report = http_benchmark(args)
+    elif args.command == 'golden':
+        report = golden(args)
+    elif args.command == 'micro':
+        report = micro(args)
+    elif args.command == 'startup':
+        report = startup(args)
+    else:
+        report = compare(args)
+    if getattr(args, 'output', None):
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    if args.command == 'golden' and args.action == 'check' and not report['ok']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
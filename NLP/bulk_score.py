@@ -0,0 +1,383 @@
+# bulk_score.py
+"""
+합격 자소서 전체 오프라인 일괄 채점 (evaluate_resume의 0.7/0.3 가중치와 등급 기준 보정용)
+
+합격 자소서 엑셀(data/잡코리아_합격자소서.xlsx)과 링커리어 수집 결과(data/linked_scraping_result.csv)를
+한 행씩 읽어 자소서 단위로 묶고, 프로세스 풀(워커마다 ResumeEvaluator/Kiwi 하나)에서 채점한 뒤
+문항 한 행마다 모든 세부 점수를 열로 저장합니다.
+
+    python bulk_score.py                                  # data/bulk_scores.parquet (pyarrow 없으면 .csv)
+    python bulk_score.py --workers 8 --chunk-size 32
+    python bulk_score.py --format csv --output scores     # scores.csv
+    python bulk_score.py --restart                        # 기존 결과를 지우고 처음부터
+
+- 입력은 파일 전체를 메모리에 올리지 않고 스트리밍하며, 연속된 같은 자소서 키(엑셀 Essay_ID,
+  CSV 회사명/연도/직무명)의 행을 한 자소서로 묶습니다. 같은 키가 떨어져서 다시 나오면
+  essay_id 뒤에 '#2'처럼 출현 순번을 붙여 별도 자소서로 채점합니다.
+- parquet 출력은 청크마다 part 파일 하나를 원자적으로 추가하는 디렉터리(pd.read_parquet로 통째로 읽음),
+  csv 출력은 한 파일에 청크 단위로 이어 씁니다 (커밋된 크기를 <출력>.progress에 기록).
+- 중단 후 같은 명령을 다시 실행하면 이미 저장된 essay_id는 건너뛰고 이어서 채점합니다
+  (csv에서 쓰다 만 청크는 마지막 커밋 지점으로 잘라냄).
+- 진행 중 --report-interval초마다, 끝나면 전체 문항 rows/sec를 출력합니다.
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ESSAY_XLSX_PATH = os.path.join(BASE_DIR, 'data', '잡코리아_합격자소서.xlsx')
+LINKED_CSV_PATH = os.path.join(BASE_DIR, 'data', 'linked_scraping_result.csv')
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, 'data', 'bulk_scores')
+
+# 출력 열 (문항 한 행, 자소서 단위 값은 문항마다 반복)
+COLUMNS = (
+    ('essay_id', 'string'),
+    ('source', 'string'),
+    ('회사명', 'string'),
+    ('직무', 'string'),
+    ('직위', 'string'),
+    ('산업분야', 'string'),
+    ('문항수', 'int64'),
+    ('질문번호', 'int64'),
+    ('질문', 'string'),
+    ('가장유사한질문', 'string'),
+    ('매칭된합격키워드', 'string'),
+    ('매칭된비전키워드', 'string'),
+    ('합격키워드점수', 'float64'),
+    ('비전정합성점수', 'float64'),
+    ('문항종합점수', 'float64'),
+    ('평균점수', 'float64'),
+    ('등급', 'string')
+)
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value).strip()
+
+
+def iter_xlsx_rows(path):
+    """엑셀 첫 시트를 {열 이름: 값} 행 단위로 읽기 (read_only 모드라 시트 전체를 올리지 않음)"""
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [_text(name) for name in next(rows, ())]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_csv_rows(path):
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+# 데이터셋별 (읽기 함수, 자소서 키, 열 이름: 직무/직위/질문/답변)
+SOURCES = {
+    'jobkorea': (iter_xlsx_rows, lambda row: _text(row.get('Essay_ID')),
+                 {'직무': '직무', '직위': '직위', '질문': '질문', '답변': '답변'}),
+    'linkareer': (iter_csv_rows, lambda row: '|'.join(_text(row.get(c)) for c in ('회사명', '연도', '직무명')),
+                  {'직무': '직무명', '직위': '경력', '질문': '질문 내용', '답변': '답변'})
+}
+
+
+def iter_essays(inputs):
+    """[(source, 경로)]의 행을 스트리밍하며 자소서 단위 dict로 묶어 반환 (답변이 없는 자소서는 제외)"""
+    for source, path in inputs:
+        read_rows, essay_key, columns = SOURCES[source]
+        seen = {}
+        for key, rows in itertools.groupby(read_rows(path), key=essay_key):
+            rows = list(rows)
+            seen[key] = seen.get(key, 0) + 1
+            essay_id = f"{source}:{key}" if seen[key] == 1 else f"{source}:{key}#{seen[key]}"
+            qa_pairs = [{'question': _text(row.get(columns['질문'])), 'answer': _text(row.get(columns['답변']))}
+                        for row in rows if _text(row.get(columns['답변']))]
+            if not qa_pairs:
+                continue
+            first = rows[0]
+            yield {
+                'essay_id': essay_id,
+                'source': source,
+                '회사명': _text(first.get('회사명')),
+                '직무': _text(first.get(columns['직무'])),
+                '직위': _text(first.get(columns['직위'])) or '신입',
+                'qa_pairs': qa_pairs
+            }
+
+
+# 워커 프로세스별 평가기 (풀 initializer에서 한 번만 생성)
+_evaluator = None
+
+
+def _init_worker():
+    global _evaluator
+    # 병렬화는 프로세스 단위로 하므로 워커 안의 Kiwi는 스레드 하나만 사용
+    os.environ.setdefault('KIWI_NUM_WORKERS', '1')
+    from resume_evaluator import ResumeEvaluator
+    _evaluator = ResumeEvaluator()
+
+
+def score_chunk(essays):
+    """자소서 묶음 채점 -> (출력 행 목록, [(essay_id, 오류 메시지)])"""
+    if _evaluator is None:
+        _init_worker()
+    rows = []
+    errors = []
+    results = _evaluator.evaluate_many(essays)
+    for essay, result in zip(essays, results):
+        if 'error' in result:
+            errors.append((essay['essay_id'], result['error']))
+            continue
+        for detail in result['상세결과']:
+            rows.append({
+                'essay_id': essay['essay_id'],
+                'source': essay['source'],
+                '회사명': essay['회사명'],
+                '직무': essay['직무'],
+                '직위': essay['직위'],
+                '산업분야': result['산업분야'],
+                '문항수': len(essay['qa_pairs']),
+                '질문번호': detail['질문번호'],
+                '질문': detail['사용자질문'],
+                '가장유사한질문': detail['가장유사한질문'],
+                '매칭된합격키워드': detail['매칭된합격키워드'],
+                '매칭된비전키워드': detail['매칭된비전키워드'],
+                '합격키워드점수': detail['합격키워드점수'],
+                '비전정합성점수': detail['비전정합성점수'],
+                '문항종합점수': detail['문항종합점수'],
+                '평균점수': result['평균점수'],
+                '등급': result['등급']
+            })
+    return rows, errors
+
+
+class CsvOutput:
+    """한 CSV 파일에 청크 단위로 이어 쓰기 (청크를 fsync한 뒤 커밋된 바이트 수를 .progress에 기록)"""
+
+    def __init__(self, path, restart=False):
+        self.path = path
+        self.progress_path = path + '.progress'
+        if restart:
+            for stale in (path, self.progress_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        self.done = self._recover() if os.path.exists(path) else set()
+        self._file = open(path, 'a', encoding='utf-8', newline='')
+        if self._file.tell() == 0:
+            self._append(lambda writer: writer.writerow(COLUMN_NAMES))
+
+    def _recover(self):
+        """마지막 커밋 지점 뒤의 쓰다 만 청크를 잘라내고 저장된 essay_id 집합 반환"""
+        if os.path.exists(self.progress_path):
+            with open(self.progress_path, encoding='utf-8') as f:
+                committed = json.load(f)['bytes']
+            if os.path.getsize(self.path) > committed:
+                with open(self.path, 'r+b') as f:
+                    f.truncate(committed)
+        with open(self.path, encoding='utf-8', newline='') as f:
+            return {row['essay_id'] for row in csv.DictReader(f)}
+
+    def _append(self, render):
+        buffer = io.StringIO()
+        render(csv.writer(buffer))
+        self._file.write(buffer.getvalue())
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        # 청크가 디스크에 기록된 뒤에만 커밋 지점을 옮김 (임시 파일 -> 교체)
+        tmp_path = self.progress_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'bytes': self._file.tell()}, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def write(self, rows):
+        if rows:
+            self._append(lambda writer: writer.writerows([row[name] for name in COLUMN_NAMES] for row in rows))
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetOutput:
+    """청크마다 part-NNNNN.parquet 하나를 추가하는 디렉터리 (임시 파일로 쓴 뒤 이름 변경)"""
+
+    def __init__(self, path, restart=False):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.schema = pa.schema([(name, getattr(pa, dtype)()) for name, dtype in COLUMNS])
+        os.makedirs(path, exist_ok=True)
+        parts = sorted(name for name in os.listdir(path) if name.startswith('part-'))
+        if restart:
+            for name in os.listdir(path):
+                if name.startswith('part-') or name.endswith('.tmp'):
+                    os.remove(os.path.join(path, name))
+            parts = []
+        self.done = set()
+        for name in parts:
+            if name.endswith('.parquet'):
+                table = pq.read_table(os.path.join(path, name), columns=['essay_id'])
+                self.done.update(table.column('essay_id').to_pylist())
+        self._next_part = len(parts)
+
+    def write(self, rows):
+        if not rows:
+            return
+        table = self._pa.Table.from_pylist(rows, schema=self.schema)
+        final_path = os.path.join(self.path, f'part-{self._next_part:05d}.parquet')
+        tmp_path = final_path + '.tmp'
+        self._pq.write_table(table, tmp_path)
+        os.replace(tmp_path, final_path)
+        self._next_part += 1
+
+    def close(self):
+        pass
+
+
+def open_output(path, output_format, restart=False):
+    """출력 형식 결정 (auto: pyarrow가 있으면 parquet, 없으면 csv) 후 (형식, 경로, 출력 객체) 반환"""
+    root, ext = os.path.splitext(path)
+    if ext in ('.parquet', '.csv'):
+        path = root
+        if output_format == 'auto':
+            output_format = ext[1:]
+    if output_format in ('auto', 'parquet'):
+        try:
+            import pyarrow.parquet  # noqa: F401
+            output_format = 'parquet'
+        except ImportError:
+            if output_format == 'parquet':
+                print("pyarrow가 설치되어 있지 않아 CSV로 저장합니다")
+            output_format = 'csv'
+    path = f"{path}.{output_format}"
+    output_class = ParquetOutput if output_format == 'parquet' else CsvOutput
+    return output_format, path, output_class(path, restart)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(args):
+    inputs = []
+    if args.xlsx:
+        inputs.append(('jobkorea', args.xlsx))
+    if args.linked_csv and os.path.exists(args.linked_csv):
+        inputs.append(('linkareer', args.linked_csv))
+
+    output_format, output_path, output = open_output(args.output, args.format, args.restart)
+    print(f"출력: {output_path} ({output_format}), 이미 채점된 자소서 {len(output.done)}개는 건너뜀")
+
+    skipped = 0
+
+    def pending_essays():
+        nonlocal skipped
+        for essay in iter_essays(inputs):
+            if essay['essay_id'] in output.done:
+                skipped += 1
+                continue
+            yield essay
+
+    start = time.perf_counter()
+    last_report = start
+    stats = {'essays': 0, 'rows': 0, 'errors': 0}
+
+    def collect(rows, errors):
+        nonlocal last_report
+        output.write(rows)
+        stats['essays'] += len({row['essay_id'] for row in rows})
+        stats['rows'] += len(rows)
+        stats['errors'] += len(errors)
+        for essay_id, message in errors:
+            print(f"채점 실패 {essay_id}: {message}")
+        now = time.perf_counter()
+        if now - last_report >= args.report_interval:
+            last_report = now
+            elapsed = now - start
+            print(f"  자소서 {stats['essays']}개, 문항 {stats['rows']}개 "
+                  f"({stats['rows'] / elapsed:.1f} rows/s, {stats['essays'] / elapsed:.1f} essays/s)")
+
+    chunks = chunked(pending_essays(), args.chunk_size)
+    executor = None
+    interrupted = False
+    try:
+        if args.workers <= 1:
+            # 워커 하나면 프로세스 풀 없이 현재 프로세스에서 채점 (직렬화 비용 없음)
+            for chunk in chunks:
+                collect(*score_chunk(chunk))
+        else:
+            executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker)
+            # 입력을 끝까지 미리 읽지 않도록 제출해 둔 청크 수를 워커 수의 2배로 제한
+            pending = set()
+            for chunk in chunks:
+                pending.add(executor.submit(score_chunk, chunk))
+                if len(pending) >= args.workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        collect(*future.result())
+            for future in pending:
+                collect(*future.result())
+            executor.shutdown()
+    except KeyboardInterrupt:
+        interrupted = True
+        # 아직 시작하지 않은 청크는 버림 (다음 실행에서 다시 채점)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    finally:
+        output.close()
+
+    elapsed = time.perf_counter() - start
+    report = {
+        'output': output_path,
+        'format': output_format,
+        'essays': stats['essays'],
+        'rows': stats['rows'],
+        'errors': stats['errors'],
+        'skipped_essays': skipped,
+        'duration_s': round(elapsed, 3),
+        'rows_per_s': round(stats['rows'] / elapsed, 2) if elapsed > 0 else None,
+        'workers': args.workers,
+        'interrupted': interrupted
+    }
+    if interrupted:
+        print("중단되었습니다. 같은 명령을 다시 실행하면 저장된 자소서 다음부터 이어서 채점합니다")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합격 자소서 전체 오프라인 일괄 채점")
+    parser.add_argument('--xlsx', default=ESSAY_XLSX_PATH, help='잡코리아 합격 자소서 엑셀')
+    parser.add_argument('--linked-csv', default=LINKED_CSV_PATH, help='링커리어 수집 결과 CSV (없으면 생략)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='출력 경로 (확장자는 형식에 맞게 붙음)')
+    parser.add_argument('--format', choices=['auto', 'parquet', 'csv'], default='auto')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=16, help='워커에 한 번에 넘기는 자소서 수')
+    parser.add_argument('--report-interval', type=float, default=5.0, help='진행 상황 출력 간격 (초)')
+    parser.add_argument('--restart', action='store_true', help='기존 결과를 지우고 처음부터 채점')
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if report['interrupted']:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# company_index.py
+from pattern_matcher import MultiPatternMatcher
+
+
+class CompanyProfile:
+    """100대 기업 한 곳의 비전/핵심가치 매칭 키워드"""
+    __slots__ = ('name', 'industry', 'keywords', 'keyword_set')
+
+    def __init__(self, name, industry, keywords):
+        self.name = name
+        self.industry = industry
+        self.keywords = keywords                  # 핵심가치 + 비전/핵심가치 명사 (순서 유지 tuple)
+        self.keyword_set = frozenset(keywords)
+
+
+class CompanyIndex:
+    """
+    기업별 비전 키워드를 미리 만들어 두고, 답변 텍스트를 한 번 훑어 모든 기업과의 적합도를 계산
+    (전체 기업 키워드를 하나의 MultiPatternMatcher로 컴파일 -> 기업별 집합 교집합)
+    """
+
+    def __init__(self, company_info_map, extract_nouns):
+        """extract_nouns: 텍스트 -> 명사 목록 (비전 문장/핵심가치 분해용, 영문 키워드는 소문자로 비교)"""
+        self.profiles = []
+        self.industries = []
+        for name, info in company_info_map.items():
+            keywords = [value.lower() for value in info.get('core_values', []) if value]
+            for text in [info.get('vision', '')] + keywords:
+                keywords.extend(noun.lower() for noun in extract_nouns(text) if len(noun) >= 2)
+            industry = info.get('industry', '기타')
+            self.profiles.append(CompanyProfile(name, industry, tuple(dict.fromkeys(keywords))))
+            if industry not in self.industries:
+                self.industries.append(industry)
+
+        all_keywords = [kw for profile in self.profiles for kw in profile.keywords]
+        self.matcher = MultiPatternMatcher(all_keywords) if all_keywords else None
+
+    def match(self, texts):
+        """여러 답변 텍스트에 나오는 기업 키워드 전체 집합"""
+        found = set()
+        if self.matcher is not None:
+            for text in texts:
+                found |= self.matcher.found(text.lower())
+        return found
+
+    def rank(self, found, industries=None):
+        """[(기업, 매칭 키워드 목록, 적합도 점수)]를 적합도 내림차순으로 (동점은 데이터 순서)"""
+        ranked = []
+        for order, profile in enumerate(self.profiles):
+            if industries and profile.industry not in industries:
+                continue
+            matched = [kw for kw in profile.keywords if kw in found]
+            score = 100 * len(matched) / len(profile.keywords) if profile.keywords else 0.0
+            ranked.append((-score, order, profile, matched))
+        ranked.sort(key=lambda item: (item[0], item[1]))
+        return [(profile, matched, -neg_score) for neg_score, _, profile, matched in ranked]
@@ -0,0 +1,77 @@
+# english_nlp.py
+"""
+영문 답변 처리용 NLTK 지연 로드
+
+한국어 위주 트래픽에서는 영문 분기(라틴 문자 비율 50% 초과)가 드물기 때문에 NLTK import와
+데이터 확인/다운로드는 영문 답변을 처음 처리할 때 한 번만 수행합니다.
+불용어 집합도 처음 한 번만 읽어 모듈 전역에 보관합니다 (읽지 못하면 최소 불용어를 쓰고 잠시 후 다시 시도).
+"""
+import threading
+import time
+
+# NLTK 불용어를 읽을 수 없을 때 사용하는 최소 불용어
+FALLBACK_STOPWORDS = frozenset(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+
+NLTK_RESOURCES = (
+    ('tokenizers/punkt', 'punkt'),
+    ('corpora/stopwords', 'stopwords'),
+    ('taggers/averaged_perceptron_tagger', 'averaged_perceptron_tagger')
+)
+
+# 불용어 로드 실패 후 다시 시도하기까지 기다리는 시간 (초)
+STOPWORDS_RETRY_SECONDS = 60
+
+_lock = threading.Lock()
+_nltk = None
+_stopwords = None
+_stopwords_retry_at = 0.0
+
+
+def load_nltk():
+    """NLTK import 및 데이터 확인 (처음 호출 시에만, 없으면 다운로드)"""
+    global _nltk
+    if _nltk is None:
+        with _lock:
+            if _nltk is None:
+                import nltk
+                try:
+                    for resource, _ in NLTK_RESOURCES:
+                        nltk.data.find(resource)
+                except LookupError:
+                    for _, package in NLTK_RESOURCES:
+                        nltk.download(package)
+                _nltk = nltk
+    return _nltk
+
+
+def is_loaded():
+    """NLTK가 이미 로드되었는지 여부"""
+    return _nltk is not None
+
+
+def english_stopwords():
+    """영어 불용어 집합 (처음 읽은 뒤 재사용, 실패하면 캐시하지 않고 STOPWORDS_RETRY_SECONDS 뒤 재시도)"""
+    global _stopwords, _stopwords_retry_at
+    if _stopwords is None:
+        if time.monotonic() < _stopwords_retry_at:
+            return FALLBACK_STOPWORDS
+        try:
+            load_nltk()
+            from nltk.corpus import stopwords
+            _stopwords = frozenset(stopwords.words('english'))
+        except Exception:
+            _stopwords_retry_at = time.monotonic() + STOPWORDS_RETRY_SECONDS
+            return FALLBACK_STOPWORDS
+    return _stopwords
+
+
+def word_tokenize(text):
+    load_nltk()
+    from nltk.tokenize import word_tokenize as tokenize
+    return tokenize(text)
+
+
+def pos_tag(tokens):
+    load_nltk()
+    from nltk.tag import pos_tag as tag
+    return tag(tokens)
@@ -0,0 +1,181 @@
+# essay_index.py
+"""
+합격 자소서 유사 답변 검색 (MinHash + LSH 근사 최근접 이웃)
+
+- 각 합격 답변의 Kiwi 명사 shingle 집합으로 MinHash 서명(num_perm개)을 만들고,
+  서명을 bands개 구간으로 나눈 LSH 버킷에 등록합니다.
+- 질의 시 같은 버킷을 공유하는 후보만 꺼낸 뒤 실제 shingle 집합의 Jaccard 유사도로 재정렬합니다.
+- 색인은 `python essay_index.py build`로 미리 만들어 두고 서버 시작 시 로드합니다.
+
+메모리 사용량 (문서 N개, 문서당 평균 shingle S개 기준)
+- MinHash 서명: N x num_perm x 4 byte (기본 128 -> 문서당 512 byte)
+- LSH 버킷: bands개 dict, 문서당 버킷 키(bytes, rows x 4 byte) + 문서 번호 참조 bands개
+- 재정렬용 shingle 해시: N x S x 4 byte (정렬된 uint32 배열)
+- 메타데이터: 회사명/직무/직위/질문/답변 원문
+번들 데이터(약 1,100개 답변) 기준 전체 수 MB 수준이며, 실제 값은 `describe()`로 확인할 수 있습니다.
+"""
+import argparse
+import os
+import pickle
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# 2^31 - 1 (메르센 소수): a * x 가 uint64 범위를 넘지 않도록 shingle 해시를 이 범위로 축소
+_PRIME = np.uint64((1 << 31) - 1)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'essay_lsh.pkl')
+
+
+def shingle_hashes(nouns, shingle_size=1):
+    """명사 목록 -> 정렬된 shingle 해시 배열 (uint32)"""
+    if len(nouns) < shingle_size:
+        return np.empty(0, dtype=np.uint32)
+    shingles = {' '.join(nouns[i:i + shingle_size]) for i in range(len(nouns) - shingle_size + 1)}
+    hashes = {zlib.crc32(s.encode('utf-8')) % int(_PRIME) for s in shingles}
+    return np.array(sorted(hashes), dtype=np.uint32)
+
+
+class EssayIndex:
+    """합격 자소서 답변 MinHash LSH 색인"""
+
+    def __init__(self, num_perm=128, bands=64, shingle_size=1, seed=42):
+        if num_perm % bands != 0:
+            raise ValueError('num_perm은 bands의 배수여야 합니다')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+        self.signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self.shingles = []                           # 문서별 정렬된 shingle 해시
+        self.buckets = [{} for _ in range(bands)]    # band별 {버킷 키: [문서 번호]}
+        self.essays = []                             # 문서별 메타데이터
+
+    def signature(self, hashes):
+        """shingle 해시 배열 -> MinHash 서명"""
+        if len(hashes) == 0:
+            return np.full(self.num_perm, int(_PRIME), dtype=np.uint32)
+        x = hashes.astype(np.uint64)
+        values = (np.outer(self._a, x) + self._b[:, None]) % _PRIME
+        return values.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def build(self, essays, noun_lists):
+        """essays: 메타데이터 dict 목록, noun_lists: 같은 순서의 명사 목록"""
+        signatures = []
+        for essay, nouns in zip(essays, noun_lists):
+            hashes = shingle_hashes(nouns, self.shingle_size)
+            if len(hashes) == 0:
+                continue
+            doc_id = len(self.essays)
+            signature = self.signature(hashes)
+            for band, key in enumerate(self._band_keys(signature)):
+                self.buckets[band].setdefault(key, []).append(doc_id)
+            signatures.append(signature)
+            self.shingles.append(hashes)
+            self.essays.append(essay)
+        if signatures:
+            self.signatures = np.vstack(signatures)
+        return self
+
+    def query(self, nouns, top_k=5):
+        """명사 목록과 가장 유사한 합격 답변 상위 top_k개 [(메타데이터, Jaccard 유사도)]"""
+        hashes = shingle_hashes(nouns, self.shingle_size)
+        if len(hashes) == 0:
+            return []
+
+        candidates = set()
+        for band, key in enumerate(self._band_keys(self.signature(hashes))):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        scored = []
+        for doc_id in candidates:
+            other = self.shingles[doc_id]
+            intersection = len(np.intersect1d(hashes, other, assume_unique=True))
+            union = len(hashes) + len(other) - intersection
+            scored.append((intersection / union if union else 0.0, doc_id))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.essays[doc_id], similarity) for similarity, doc_id in scored[:top_k]]
+
+    def describe(self):
+        """색인 규모와 대략적인 메모리 사용량 (byte)"""
+        bucket_keys = sum(len(b) for b in self.buckets)
+        return {
+            '문서수': len(self.essays),
+            'num_perm': self.num_perm,
+            'bands': self.bands,
+            'signature_bytes': int(self.signatures.nbytes),
+            'shingle_bytes': int(sum(s.nbytes for s in self.shingles)),
+            'bucket_keys': bucket_keys,
+            'bucket_bytes_estimate': bucket_keys * (self.rows * 4 + 8) + len(self.essays) * self.bands * 8,
+            'text_bytes': sum(len(e['답변'].encode('utf-8')) + len(e['질문'].encode('utf-8')) for e in self.essays)
+        }
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        # 클래스 경로에 의존하지 않도록 속성 dict만 저장 (스크립트 실행 시 __main__ 문제 방지)
+        with open(path, 'wb') as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        return index
+
+
+def build_from_excel(evaluator, excel_path, **kwargs):
+    """합격 자소서 엑셀의 모든 답변으로 색인 생성 (명사는 평가기와 같은 분석 결과 사용)"""
+    df = pd.read_excel(excel_path, engine='openpyxl').fillna('')
+    essays = []
+    answers = []
+    for _, row in df.iterrows():
+        answer = evaluator.clean_text(row['답변'])
+        if not answer:
+            continue
+        essays.append({
+            '회사명': str(row.get('회사명', '')),
+            '직무': str(row.get('직무', '')),
+            '직위': str(row.get('직위', '')),
+            '질문': evaluator.clean_text(row.get('질문', '')),
+            '답변': answer
+        })
+        answers.append(answer)
+
+    documents = evaluator.analyze_many(answers)
+    return EssayIndex(**kwargs).build(essays, [documents[a].nouns for a in answers])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합격 자소서 유사 답변 검색 색인 (MinHash LSH)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='합격 자소서 엑셀로 색인 생성')
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    build.add_argument('--input', default=os.path.join(base_dir, 'data', '잡코리아_합격자소서.xlsx'))
+    build.add_argument('--output', default=DEFAULT_INDEX_PATH)
+    build.add_argument('--num-perm', type=int, default=128)
+    build.add_argument('--bands', type=int, default=64)
+    build.add_argument('--shingle-size', type=int, default=1)
+    args = parser.parse_args()
+
+    from resume_evaluator import ResumeEvaluator
+    evaluator = ResumeEvaluator()
+    index = build_from_excel(evaluator, args.input, num_perm=args.num_perm, bands=args.bands,
+                             shingle_size=args.shingle_size)
+    index.save(args.output)
+    print(f"색인 저장 완료: {args.output}")
+    for key, value in index.describe().items():
+        print(f"  - {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
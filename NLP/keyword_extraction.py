@@ -3,11 +3,24 @@ import pandas as pd
 from kiwipiepy import Kiwi
 from collections import Counter
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
+import english_nlp
 import random
+from token_cache import token_cache, text_key
+
+
+def write_csv_atomic(df, output_file):
+    """
+    같은 디렉터리의 임시 파일에 다 쓴 뒤 os.replace로 교체
+    (평가 서버가 파일 변경을 감지해 다시 읽을 때 쓰는 도중의 잘린 파일을 읽지 않도록)
+    """
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        df.to_csv(tmp_file, index=False, encoding='utf-8-sig')
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
 
 class KeywordExtractor:
     def __init__(self, file_path=None):
@@ -16,17 +29,9 @@ class KeywordExtractor:
             file_path = os.path.join(base_dir, 'data', '잡코리아_합격자소서.xlsx')
         self.file_path = file_path
         self.kiwi = Kiwi()
+        # 회사명 예외 목록이 데이터 파일마다 다르므로 캐시 네임스페이스를 파일별로 분리
+        self._cache_namespace = ('keyword.words', os.path.abspath(self.file_path))
 
-        # NLTK 데이터 다운로드 (처음 실행시에만 필요)
-        try:
-            nltk.data.find('tokenizers/punkt')
-            nltk.data.find('corpora/stopwords')
-            nltk.data.find('taggers/averaged_perceptron_tagger')
-        except LookupError:
-            nltk.download('punkt')
-            nltk.download('stopwords')
-            nltk.download('averaged_perceptron_tagger')
-        
         # 데이터 로드 및 회사명 추출
         try:
             df = pd.read_excel(self.file_path, engine='openpyxl')
@@ -116,6 +121,14 @@ class KeywordExtractor:
         if not text:
             return []
         
+        # 같은 질문이 반복 비교되므로 결과를 공유 캐시에 보관
+        if isinstance(text, str):
+            key = text_key(self._cache_namespace, text)
+            return list(token_cache.get_or_compute(key, lambda: tuple(self._extract_words(text))))
+        return self._extract_words(text)
+
+    def _extract_words(self, text):
+        """extract_words 본체"""
         # null bytes 제거 및 회사명 예외 처리
         text = self.clean_text(text)
         
@@ -245,11 +258,6 @@ class KeywordExtractor:
         korean_nouns = []
         english_words = []
         
-        try:
-            english_stopwords = set(stopwords.words('english'))
-        except:
-            english_stopwords = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
-        
         for answer in answers:
             if pd.isna(answer) or answer == '':
                 continue
@@ -268,10 +276,11 @@ class KeywordExtractor:
             is_english = english_chars / max(total_chars, 1) > 0.5
             
             if is_english:
-                # 영어 텍스트 처리
+                # 영어 텍스트 처리 (NLTK/불용어는 처음 영문 답변을 만났을 때 로드)
+                english_stopwords = english_nlp.english_stopwords()
                 try:
-                    tokens = word_tokenize(cleaned_answer.lower())
-                    pos_tags = pos_tag(tokens)
+                    tokens = english_nlp.word_tokenize(cleaned_answer.lower())
+                    pos_tags = english_nlp.pos_tag(tokens)
                     words = [word for word, pos in pos_tags 
                             if pos.startswith(('NN', 'JJ', 'VB')) 
                             and len(word) >= 2 
@@ -384,7 +393,7 @@ class KeywordExtractor:
         # 결과를 DataFrame으로 변환
         result_df = pd.DataFrame(separate_results)
         output_file = 'jobkorea_keyword_analysis.csv'
-        result_df.to_csv(output_file, index=False, encoding='utf-8-sig')
+        write_csv_atomic(result_df, output_file)
         
         print(f"\n=== 분석 완료 ===")
         print(f"결과가 '{output_file}' 파일로 저장되었습니다.")
@@ -395,7 +404,7 @@ class KeywordExtractor:
         # 결과를 DataFrame으로 변환
         result_df = pd.DataFrame(separate_results)
         output_file = 'jobkorea_keyword_analysis.csv'
-        result_df.to_csv(output_file, index=False, encoding='utf-8-sig')
+        write_csv_atomic(result_df, output_file)
         
         print(f"\n=== 분석 완료 ===")
         print(f"결과가 '{output_file}' 파일로 저장되었습니다.")
@@ -0,0 +1,233 @@
+# metrics.py
+"""
+평가기 단계별 지연 시간/처리량 지표 (Prometheus 텍스트 형식)
+
+- Counter: 단조 증가 카운터 (라벨별)
+- Histogram: 누적 버킷 지연 시간 분포 (라벨별)
+- CallbackMetric: 수집 시점에 값을 읽어 오는 지표 (캐시 통계 등 이미 집계된 값)
+
+기록 비용은 perf_counter 두 번과 짧은 락 한 번 수준입니다.
+지표는 프로세스 단위로 집계되므로 pre-fork 모드에서는 /metrics 요청을 받은 워커의 값입니다.
+"""
+import bisect
+import threading
+import time
+from functools import wraps
+
+# 기본 지연 시간 버킷 (초): 형태소 캐시 적중(수 us)부터 대형 배치(수 초)까지
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """지표 목록과 텍스트 출력"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter:
+    """라벨별 단조 증가 카운터"""
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = _CounterChild()
+        registry.register(self)
+
+    def labels(self, *labelvalues):
+        """라벨 값에 해당하는 하위 카운터 (자주 쓰는 라벨은 미리 받아 두고 재사용)"""
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labelvalues, _CounterChild())
+        return child
+
+    def inc(self, amount=1):
+        self._children[()].inc(amount)
+
+    def samples(self):
+        with self._lock:
+            children = sorted(self._children.items())
+        return [f'{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}'
+                for values, child in children]
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class _Timer:
+    """with 블록 실행 시간을 히스토그램에 기록"""
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Histogram:
+    """라벨별 누적 버킷 히스토그램"""
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = _HistogramChild(self.bounds)
+        registry.register(self)
+
+    def labels(self, *labelvalues):
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labelvalues, _HistogramChild(self.bounds))
+        return child
+
+    def observe(self, value):
+        self._children[()].observe(value)
+
+    def time(self):
+        return self._children[()].time()
+
+    def samples(self):
+        with self._lock:
+            children = sorted(self._children.items())
+        lines = []
+        for values, child in children:
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class CallbackMetric:
+    """수집 시점에 callback()이 돌려준 {라벨 값 튜플: 값}을 출력"""
+
+    def __init__(self, name, help, kind, callback, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        registry.register(self)
+
+    def samples(self):
+        try:
+            values = self.callback()
+        except Exception:
+            return []
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                for labels, value in sorted(values.items())]
+
+
+def timed(child):
+    """함수 실행 시간을 히스토그램(하위 지표)에 기록하는 데코레이터"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def render():
+    """전역 레지스트리의 모든 지표를 Prometheus 텍스트 형식으로 반환"""
+    return REGISTRY.render()
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
@@ -0,0 +1,40 @@
+# pattern_matcher.py
+import re
+
+
+class MultiPatternMatcher:
+    """
+    여러 문자열 키워드를 하나의 정규식으로 미리 컴파일해 텍스트를 한 번만 훑는 매처
+
+    - 전방 탐색(?=...)으로 겹치는 위치의 출현도 모두 찾음
+    - 같은 위치에서는 가장 긴 키워드가 잡히므로, 그 키워드의 접두사인 짧은 키워드도 함께 출현으로 보고
+      (`kw in text`를 키워드마다 반복한 것과 같은 결과)
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(keywords))   # 중복 제거 (순서 유지)
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        # 첫 글자 문자 집합으로 후보 위치를 먼저 거른 뒤 키워드 비교
+        first_chars = ''.join(sorted({kw[0] for kw in self.keywords if kw}))
+        self._regex = re.compile('(?=[' + re.escape(first_chars) + '])(?=('
+                                 + '|'.join(re.escape(kw) for kw in ordered) + '))')
+        # 키워드 -> 그 키워드의 접두사인 다른 키워드들
+        self._prefixes = {
+            kw: tuple(other for other in self.keywords if other != kw and kw.startswith(other))
+            for kw in self.keywords
+        }
+
+    def finditer(self, text):
+        """(시작 위치, 키워드) 출현을 위치 순서대로 반환"""
+        for match in self._regex.finditer(text):
+            keyword = match.group(1)
+            yield match.start(), keyword
+            for prefix in self._prefixes[keyword]:
+                yield match.start(), prefix
+
+    def found(self, text):
+        """텍스트에 한 번 이상 나오는 키워드 집합"""
+        found = set(self._regex.findall(text))
+        for keyword in list(found):
+            found.update(self._prefixes[keyword])
+        return found
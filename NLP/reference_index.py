@@ -0,0 +1,345 @@
+# reference_index.py
+import csv
+import heapq
+import math
+import os
+import sys
+from collections import Counter
+
+# 합격 자소서 분석 CSV 컬럼 -> ReferenceEntry 속성
+REFERENCE_COLUMNS = {
+    '산업분야': 'industry',
+    '직무': 'job_title',
+    '직위': 'position',
+    '질문순위': 'question_rank',
+    '핵심단어': 'keyword',
+    '질문빈도': 'question_frequency',
+    '답변키워드_TOP20': 'answer_keyword_list'
+}
+
+
+def _is_missing(value):
+    return value is None or value == '' or (isinstance(value, float) and math.isnan(value))
+
+
+def _text(value):
+    """빈 값은 None, 나머지는 intern된 문자열 (행마다 반복되는 직무/직위/키워드를 한 객체로 공유)"""
+    return None if _is_missing(value) else sys.intern(str(value))
+
+
+def _number(value):
+    if _is_missing(value):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_reference_csv(csv_path):
+    """참조 CSV를 행 dict 목록으로 읽기 (DataFrame 없이 색인 생성용)"""
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def validate_reference_csv(csv_path, rows, previous_count=None, min_ratio=0.5):
+    """
+    다시 읽은 참조 CSV가 교체해도 되는 상태인지 확인 (아니면 ValueError)
+    csv.DictReader는 잘린 파일도 오류 없이 읽으므로 파일 끝 줄바꿈, 컬럼, 빈 필드, 행 수로 판단
+    rows: read_reference_csv(csv_path) 결과
+    previous_count: 현재 사용 중인 스냅샷의 행 수 (그 min_ratio배보다 적으면 거부)
+    """
+    # DataFrame.to_csv는 항상 줄바꿈으로 끝남
+    with open(csv_path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(-1, os.SEEK_END)
+        if not size or f.read(1) != b'\n':
+            raise ValueError("참조 CSV가 줄바꿈으로 끝나지 않습니다 (잘린 파일)")
+    if not rows:
+        raise ValueError("참조 CSV에 행이 없습니다")
+    missing = [column for column in REFERENCE_COLUMNS if column not in rows[0]]
+    if missing:
+        raise ValueError(f"참조 CSV에 필수 컬럼이 없습니다: {', '.join(missing)}")
+    # 중간에 잘린 행은 뒤쪽 컬럼이 None (빈 칸은 '')
+    for number, row in enumerate(rows, 1):
+        if any(row.get(column) is None for column in REFERENCE_COLUMNS):
+            raise ValueError(f"참조 CSV {number}번째 행의 필드가 부족합니다 (잘린 파일)")
+    if previous_count and len(rows) < previous_count * min_ratio:
+        raise ValueError(f"참조 CSV 행 수가 {previous_count}개에서 {len(rows)}개로 줄었습니다")
+
+
+class ReferenceEntry:
+    """참조 CSV 한 행 (문자열은 intern, 답변 키워드는 공유 문자열의 tuple/frozenset으로 보관)"""
+    __slots__ = ('order', 'industry', 'job_title', 'position', 'question_rank', 'keyword', 'question_frequency',
+                 'answer_keyword_list', 'answer_keywords', 'cleaned_keyword', 'keyword_words', 'category')
+
+    def __init__(self, order, row):
+        self.order = order                                   # CSV 내 행 순서 (동점일 때 앞선 행 우선)
+        self.industry = _text(row.get('산업분야'))
+        self.job_title = _text(row.get('직무'))
+        self.position = _text(row.get('직위'))
+        self.question_rank = _number(row.get('질문순위'))
+        self.keyword = _text(row.get('핵심단어'))            # 원본 핵심단어
+        self.question_frequency = _number(row.get('질문빈도'))
+
+        answer_keywords = row.get('답변키워드_TOP20')
+        if _is_missing(answer_keywords):
+            self.answer_keyword_list = None
+            self.answer_keywords = None
+        else:
+            self.answer_keyword_list = tuple(sys.intern(kw.strip()) for kw in str(answer_keywords).split(','))
+            self.answer_keywords = frozenset(self.answer_keyword_list)   # 키워드 매칭용 집합
+
+        self.cleaned_keyword = None   # 정제된 핵심단어
+        self.keyword_words = None     # 핵심단어 토큰 집합 (frozenset)
+        self.category = None          # 핵심단어가 카테고리명이면 해당 카테고리, 아니면 None
+
+    def __getitem__(self, column):
+        """원본 CSV 컬럼명으로 조회 (기존 행 접근 코드 호환)"""
+        value = getattr(self, REFERENCE_COLUMNS[column])
+        if column == '답변키워드_TOP20' and value is not None:
+            return ', '.join(value)
+        return value
+
+    def get(self, column, default=None):
+        value = self[column] if column in REFERENCE_COLUMNS else None
+        return default if value is None else value
+
+    def to_dict(self):
+        return {column: self[column] for column in REFERENCE_COLUMNS}
+
+
+class ReferenceQuery:
+    """사용자 질문 한 건의 비교용 정보 (토큰은 필요할 때만 추출)"""
+    __slots__ = ('text', 'category', '_words', '_extract_words')
+
+    def __init__(self, text, category, extract_words):
+        self.text = text
+        self.category = category
+        self._words = None
+        self._extract_words = extract_words
+
+    @property
+    def words(self):
+        if self._words is None:
+            self._words = frozenset(self._extract_words(self.text))
+        return self._words
+
+
+class BM25Index:
+    """참조 질문 문서에 대한 희소 역색인 (BM25 점수)"""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        """documents: [(ReferenceEntry, 토큰 목록)]"""
+        self.k1 = k1
+        self.entries = []
+        self.postings = {}   # 단어 -> [(문서 번호, 빈도)]
+        lengths = []
+
+        for doc_id, (entry, tokens) in enumerate(documents):
+            self.entries.append(entry)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+
+        n_docs = len(self.entries)
+        avg_length = (sum(lengths) / n_docs) if n_docs else 1.0
+        self.idf = {
+            term: math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+        # 문서 길이 정규화 항 k1 * (1 - b + b * dl / avgdl) 미리 계산
+        self.length_norms = [k1 * (1 - b + b * length / max(avg_length, 1e-9)) for length in lengths]
+
+    def search(self, tokens, top_k=5):
+        """질문 토큰과 단어를 공유하는 문서만 훑어 상위 top_k개 (entry, 점수) 반환"""
+        scores = {}
+        for term in set(tokens):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in postings:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.length_norms[doc_id])
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self.entries[doc_id], score) for doc_id, score in best]
+
+
+class ReferenceGroup:
+    """(직무, 직위) / 직무 / 전체 단위로 묶인 참조 항목"""
+    __slots__ = ('entries', 'by_category', 'free_by_text', 'free_postings', 'max_free_length', 'bm25')
+
+    def __init__(self):
+        self.entries = []
+        self.by_category = {}     # 카테고리 -> 해당 카테고리의 첫 번째 항목
+        self.free_by_text = {}    # 카테고리명이 아닌 핵심단어 -> 항목 목록 (부분 문자열 매칭용)
+        self.free_postings = {}   # 핵심단어 토큰 -> 항목 목록 (단어 집합 비교 후보)
+        self.max_free_length = 0
+        self.bm25 = None
+
+    def add(self, entry):
+        self.entries.append(entry)
+        if entry.category is not None:
+            self.by_category.setdefault(entry.category, entry)
+            return
+
+        if entry.cleaned_keyword:
+            self.free_by_text.setdefault(entry.cleaned_keyword, []).append(entry)
+            self.max_free_length = max(self.max_free_length, len(entry.cleaned_keyword))
+        for word in entry.keyword_words:
+            self.free_postings.setdefault(word, []).append(entry)
+
+    def build_search_index(self, documents):
+        """그룹 항목의 BM25 역색인 생성 (documents: 행 순서 -> 토큰 목록)"""
+        self.bm25 = BM25Index([(entry, documents[entry.order]) for entry in self.entries])
+
+    def _free_candidates(self, query):
+        """유사도가 0보다 클 수 있는 자유 핵심단어 항목만 수집 (역색인 + 부분 문자열)"""
+        candidates = {}
+
+        # 질문에 포함된 핵심단어 (질문의 부분 문자열을 길이 제한 내에서 사전 조회)
+        text = query.text
+        if text and self.free_by_text:
+            for start in range(len(text)):
+                for end in range(start + 1, min(len(text), start + self.max_free_length) + 1):
+                    for entry in self.free_by_text.get(text[start:end], ()):
+                        candidates[entry.order] = entry
+
+        # 질문과 토큰을 하나 이상 공유하는 핵심단어
+        if self.free_postings:
+            for word in query.words:
+                for entry in self.free_postings.get(word, ()):
+                    candidates[entry.order] = entry
+
+        return [candidates[order] for order in sorted(candidates)]
+
+    def find_best(self, query):
+        """그룹 내 최고 유사도 항목 검색 (행 순서대로 훑는 것과 동일한 결과)"""
+        best_entry = None
+        max_similarity = 0
+
+        # 카테고리 핵심단어는 질문 카테고리와 같을 때만 1.0, 나머지는 0.0
+        category_entry = self.by_category.get(query.category) if query.category else None
+        if category_entry is not None:
+            best_entry, max_similarity = category_entry, 1.0
+
+        if not self.free_by_text and not self.free_postings:
+            return best_entry, max_similarity
+
+        for entry in self._free_candidates(query):
+            if entry.cleaned_keyword and query.text and entry.cleaned_keyword in query.text:
+                similarity = 1.0
+            else:
+                words1 = query.words
+                words2 = entry.keyword_words
+                if not words1 or not words2:
+                    continue
+                intersection = len(words1 & words2)
+                similarity = intersection / (len(words1) + len(words2) - intersection)
+
+            if similarity > max_similarity or (
+                    similarity == max_similarity and best_entry is not None and similarity > 0
+                    and entry.order < best_entry.order):
+                best_entry, max_similarity = entry, similarity
+
+        return best_entry, max_similarity
+
+
+class ReferenceIndex:
+    """합격 자소서 분석 CSV를 (직무, 직위) / 직무 / 전체 단위로 미리 색인"""
+
+    def __init__(self, rows, clean_text, extract_words, categories, reference_questions=None):
+        """
+        rows: 참조 CSV 행 dict 목록 (read_reference_csv 또는 DataFrame.to_dict('records'))
+        reference_questions: BM25 문서를 보강할 원문 질문 [(직무, 직위, 카테고리, 질문)] (선택)
+        """
+        self.entries = []   # 전체 행 (핵심단어가 없는 행 포함, CSV 순서)
+        self.by_job_position = {}
+        self.by_job = {}
+        self.all = ReferenceGroup()
+        documents = {}
+
+        for order, row in enumerate(rows):
+            entry = ReferenceEntry(order, row)
+            self.entries.append(entry)
+            if entry.keyword is None:
+                continue
+
+            entry.cleaned_keyword = cleaned_keyword = clean_text(entry.keyword)
+            entry.category = cleaned_keyword if cleaned_keyword in categories else None
+            entry.keyword_words = frozenset() if entry.category else frozenset(extract_words(cleaned_keyword))
+            documents[order] = list(extract_words(cleaned_keyword))
+
+            if entry.job_title is not None:
+                self.by_job.setdefault(entry.job_title, ReferenceGroup()).add(entry)
+                if entry.position is not None:
+                    self.by_job_position.setdefault((entry.job_title, entry.position), ReferenceGroup()).add(entry)
+            self.all.add(entry)
+
+        # 원문 질문은 같은 (직무, 직위)의 같은 카테고리 항목 문서에 합쳐 검색 어휘를 넓힘
+        for job_title, position, category, question in reference_questions or ():
+            group = self.by_job_position.get((job_title, position))
+            entry = group.by_category.get(category) if group is not None else None
+            if entry is not None:
+                documents[entry.order].extend(extract_words(question))
+
+        for group in self._groups():
+            group.build_search_index(documents)
+
+    def to_dataframe(self):
+        """전체 행을 DataFrame으로 변환 (분석/디버깅용, 평가 경로에서는 사용하지 않음)"""
+        import pandas as pd
+        return pd.DataFrame([entry.to_dict() for entry in self.entries], columns=list(REFERENCE_COLUMNS))
+
+    def _groups(self):
+        yield from self.by_job_position.values()
+        yield from self.by_job.values()
+        yield self.all
+
+    # 다단계 매칭에서 도달한 단계 (지표 라벨)
+    LEVELS = ('job_position', 'job', 'all')
+
+    def find_best(self, query, job_title, position, threshold=0.2):
+        """직무+직위 -> 직무 -> 전체 순서의 다단계 매칭"""
+        best_entry, max_similarity, _ = self.match(query, job_title, position, threshold)
+        return best_entry, max_similarity
+
+    def match(self, query, job_title, position, threshold=0.2):
+        """find_best와 같은 결과에 도달한 단계 번호(0: 직무+직위, 1: 직무, 2: 전체)를 함께 반환"""
+        best_entry, max_similarity = None, 0
+
+        group = self.by_job_position.get((job_title, position))
+        if group is not None:
+            best_entry, max_similarity = group.find_best(query)
+        if best_entry is not None and max_similarity >= threshold:
+            return best_entry, max_similarity, 0
+
+        group = self.by_job.get(job_title)
+        if group is not None:
+            entry, similarity = group.find_best(query)
+            if entry is not None and similarity > max_similarity:
+                best_entry, max_similarity = entry, similarity
+        if best_entry is not None and max_similarity >= threshold:
+            return best_entry, max_similarity, 1
+
+        entry, similarity = self.all.find_best(query)
+        if entry is not None and similarity > max_similarity:
+            best_entry, max_similarity = entry, similarity
+        return best_entry, max_similarity, 2
+
+    def search(self, query, job_title, position, top_k=5):
+        """BM25 상위 top_k 검색 (직무+직위 -> 직무 -> 전체 순서로 부족한 만큼 보충)"""
+        results = []
+        seen = set()
+        for group in (self.by_job_position.get((job_title, position)), self.by_job.get(job_title), self.all):
+            if group is None:
+                continue
+            for entry, score in group.bm25.search(query.words, top_k):
+                if entry.order not in seen:
+                    seen.add(entry.order)
+                    results.append((entry, score))
+            if len(results) >= top_k:
+                break
+        return results[:top_k]
@@ -4,23 +4,112 @@ import pandas as pd
 from kiwipiepy import Kiwi
 from collections import Counter
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.tag import pos_tag
-from flask import Flask, request, jsonify
+import threading
+import time
+import hashlib
+import english_nlp
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import json
+from reference_index import ReferenceIndex, ReferenceQuery, read_reference_csv, validate_reference_csv
+from essay_index import EssayIndex, DEFAULT_INDEX_PATH
+from token_cache import LRUCache, token_cache, text_key
+from pattern_matcher import MultiPatternMatcher
+from company_index import CompanyIndex
+from admission import AdmissionController, Overloaded, DeadlineExceeded, check_deadline
+import metrics
+from metrics import timed
 
 app = Flask(__name__)
 CORS(app)
 
+# 합격 자소서 분석 CSV의 핵심단어로 쓰이는 질문 카테고리
+QUESTION_CATEGORIES = ['경험', '지원동기', '성장과정', '장단점', '입사포부', '자기소개', '직무역량', '가치관']
+
+# 카테고리별 탐색 키워드 목록 (앞선 카테고리가 우선)
+CATEGORY_KEYWORDS = {
+    '지원동기': ['지원동기', '지원 동기', '회사선택', '선택한 이유', '왜 지원', '지원하게 된'],
+    '성장과정': ['성장과정', '성장 과정', '어린 시절', '가족관계', '학창시절'],
+    '장단점': ['장단점', '장점', '단점', '강점', '약점', '성격'],
+    '입사포부': ['입사포부', '입사 후 포부', '입사후포부', '미래계획', '비전', '목표', '10년 후', '기여할'],
+    '자기소개': ['자기소개', '자기 소개', '자신을 소개'],
+    '경험': ['경험', '도전', '극복', '협업', '리더십', '실패', '갈등', '문제해결', '성공', '팀워크', '소통', '프로젝트', '인턴'],
+    '직무역량': ['역량', '직무', '전공', '과목', '준비', '전문성', '수행', '기술'],
+    '가치관': ['가치관', '윤리의식', '도덕성', '인생관', '삶의 목표', '존경하는 인물']
+}
+
+# 비전 정합성: 성향 테마 정의 (비전/핵심가치 기반)
+DISPOSITION_THEMES = {
+    "기술/혁신": ["기술", "혁신", "초격차", "R&D", "품질", "엔지니어", "전문성", "자부심"],
+    "미래/선도": ["미래", "선도", "글로벌", "최고", "변화", "이끌다", "앞서가다", "시장"],
+    "인재/협력": ["인재", "협력", "상생", "소통", "팀워크", "공헌", "사람", "성장"],
+    "실행/도전": ["도전", "실행", "열정", "완수", "책임", "끈기", "목표", "달성"]
+}
+
+# 비전 정합성: 서사 구조 패턴 (Storyline Alignment)
+# 원래 정규식 r"(.+?)(바탕으로|통해|...)"과 같이 '줄바꿈이 아닌 문자 뒤에 나오는 연결어'를 찾음
+NARRATIVE_PATTERNS = {
+    "경험_근거": ["바탕으로", "통해", "경험하며", "수행하며", "과정에서"],
+    "기술_자부심": ["역량을", "자부심을", "기술력을", "전문성을"],
+    "비전_지향": ["이끌어", "선도하는", "기여하는", "목표로", "실현하기 위해"]
+}
+
+# 비전 정합성: 비전 액션 동사
+ACTION_VERBS = ["이끌다", "선도하다", "기여하다", "혁신하다", "창출하다", "실현하다", "완수하다"]
+
+# 위 키워드들을 한 번만 컴파일한 매처 (텍스트를 한 번 훑어 모든 출현을 찾음)
+CATEGORY_MATCHER = MultiPatternMatcher(kw for keywords in CATEGORY_KEYWORDS.values() for kw in keywords)
+DISPOSITION_THEME_SETS = {theme: frozenset(keywords) for theme, keywords in DISPOSITION_THEMES.items()}
+NARRATIVE_GROUPS = {kw: name for name, keywords in NARRATIVE_PATTERNS.items() for kw in keywords}
+VISION_MATCHER = MultiPatternMatcher(list(NARRATIVE_GROUPS) + ACTION_VERBS)
+
+# 단계별 처리 시간 / 처리량 지표 (GET /metrics)
+STAGE_SECONDS = metrics.Histogram('resume_stage_seconds', '평가 단계별 처리 시간 (초)', ['stage'])
+EVALUATIONS = metrics.Counter('resume_evaluations_total', '평가한 자소서 수')
+QUESTIONS = metrics.Counter('resume_questions_total', '평가한 문항 수 (결과 캐시 적중 포함)')
+MATCH_LEVELS = metrics.Counter('resume_reference_match_level_total',
+                               '참조 질문 매칭이 도달한 단계 (job_position -> job -> all)', ['level'])
+
+def grade_for(average_score):
+    """평균 점수 -> 등급"""
+    if average_score >= 80: return "우수 (S)"
+    elif average_score >= 60: return "보통 (A)"
+    elif average_score >= 40: return "미흡 (B)"
+    else: return "부족 (C)"
+
+class AnalyzedDocument:
+    """답변 한 건의 분석 결과 (모든 점수 계산에서 공유)"""
+    __slots__ = ('text', 'is_english', 'words', 'nouns', 'noun_counts')
+
+    def __init__(self, text, is_english, words, nouns):
+        self.text = text                    # 정제된 원문 (서사 패턴/동사 매칭용)
+        self.is_english = is_english        # 영문 답변 여부
+        self.words = words                  # 체언/용언/관계언 형태소 (비전 테마 매칭용)
+        self.nouns = nouns                  # 명사(영문은 품사 필터 단어) 목록 (합격 키워드 매칭용)
+        self.noun_counts = Counter(nouns)   # 명사 빈도
+
+class ReferenceSnapshot:
+    """한 시점의 참조 데이터 묶음 (교체 단위)"""
+    __slots__ = ('reference_index', 'company_vision_data', 'company_info_map', 'company_index',
+                 'data_version', 'data_stat')
+
+    def __init__(self, reference_index, company_vision_data, company_info_map, company_index,
+                 data_version, data_stat):
+        self.reference_index = reference_index
+        self.company_vision_data = company_vision_data
+        self.company_info_map = company_info_map
+        self.company_index = company_index
+        self.data_version = data_version
+        self.data_stat = data_stat
+
 class ResumeEvaluator:
-    def __init__(self, reference_csv_path=None):
+    def __init__(self, reference_csv_path=None, reference_questions_path=None):
         """
         자소서 평가기 초기화
         Args:
             reference_csv_path: 합격 자소서 분석 결과 CSV 파일 경로
+            reference_questions_path: BM25 검색 어휘 보강용 합격 자소서 원문(xlsx) 경로 (선택,
+                                      미지정 시 REFERENCE_QUESTIONS_PATH 환경변수)
         """
         base_dir = os.path.dirname(os.path.abspath(__file__))
         if reference_csv_path is None:
@@ -28,38 +117,205 @@ class ResumeEvaluator:
         elif not os.path.isabs(reference_csv_path) and not os.path.exists(reference_csv_path):
             reference_csv_path = os.path.join(base_dir, reference_csv_path)
             
-        self.reference_df = pd.read_csv(reference_csv_path, encoding='utf-8-sig')
-        self.kiwi = Kiwi()
-        self.load_company_vision_data(base_dir)
+        self.reference_csv_path = reference_csv_path
+        self.company_json_path = os.path.join(base_dir, 'data', 'top_100_companies.json')
+        # 여러 텍스트를 한 번에 넘기면 Kiwi가 num_workers개 스레드로 나눠 분석 (-1: 전체 코어)
+        self.kiwi = Kiwi(num_workers=int(os.environ.get('KIWI_NUM_WORKERS', -1)))
+        # False면 배치 분석도 텍스트별 단건 분석으로 처리 (Kiwi 스레드 풀은 fork된 워커에서 동작하지 않음)
+        self.kiwi_batch = True
         
-        # NLTK 데이터 다운로드 (처음 실행시에만 필요)
+        # BM25 검색 어휘 보강용 원문 질문 (참조 데이터를 다시 읽을 때도 재사용)
+        if reference_questions_path is None:
+            reference_questions_path = os.environ.get('REFERENCE_QUESTIONS_PATH')
+        self.reference_questions = self.load_reference_questions(reference_questions_path)
+
+        # 문항별 평가 결과 캐시 (키에 참조 데이터 버전 포함, 데이터가 바뀌면 비움)
+        self.result_cache = LRUCache(
+            int(os.environ.get('RESULT_CACHE_SIZE', 10000)),
+            ttl=float(os.environ.get('RESULT_CACHE_TTL', 3600))
+        )
+
+        # 참조 데이터 스냅샷 (파일이 바뀌면 백그라운드에서 새로 만들어 통째로 교체)
+        self._snapshot = self.load_snapshot()
+        self._data_stat = self._snapshot.data_stat
+        self._data_checked_at = time.monotonic()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+
+    # 요청 처리 중에는 스냅샷 하나를 잡고 끝까지 사용 (교체되어도 진행 중인 요청은 이전 스냅샷으로 완료)
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def reference_df(self):
+        # 참조 데이터는 색인의 압축 레코드로만 보관하므로 DataFrame은 요청 시 새로 생성
+        return self._snapshot.reference_index.to_dataframe()
+
+    @property
+    def reference_index(self):
+        return self._snapshot.reference_index
+
+    @property
+    def company_vision_data(self):
+        return self._snapshot.company_vision_data
+
+    @property
+    def company_info_map(self):
+        return self._snapshot.company_info_map
+
+    @property
+    def data_version(self):
+        return self._snapshot.data_version
+
+    def load_snapshot(self, strict=False, previous=None):
+        """
+        참조 CSV/기업 JSON을 읽어 색인까지 만든 새 스냅샷 생성
+        strict: 기업 데이터 오류와 참조 CSV 검증 실패도 예외로 전달
+        previous: 교체할 현재 스냅샷 (행 수가 크게 줄었으면 잘린 파일로 보고 거부)
+        """
+        data_stat = self._stat_data_files()
+        data_version = self._data_version()
+        reference_rows = read_reference_csv(self.reference_csv_path)
+        if strict:
+            previous_count = len(previous.reference_index.entries) if previous is not None else None
+            validate_reference_csv(self.reference_csv_path, reference_rows, previous_count,
+                                    float(os.environ.get('RELOAD_MIN_ROW_RATIO', 0.5)))
+        company_vision_data, company_info_map = self.load_company_vision_data(self.company_json_path, strict)
+
+        # 직무/직위별 참조 질문 색인 (핵심단어 토큰, 카테고리, 답변 키워드 집합 사전 계산)
+        reference_index = ReferenceIndex(
+            reference_rows, self.clean_text, self.extract_words, QUESTION_CATEGORIES,
+            reference_questions=self.reference_questions
+        )
+        # 기업별 비전/핵심가치 키워드 매처 (여러 기업 동시 비교용)
+        company_index = CompanyIndex(company_info_map, self._company_keywords)
+        return ReferenceSnapshot(reference_index, company_vision_data, company_info_map, company_index,
+                                 data_version, data_stat)
+
+    def _data_files(self):
+        return [self.reference_csv_path, self.company_json_path]
+
+    def _data_version(self):
+        """참조 CSV와 기업 JSON 내용 해시 (결과 캐시 키에 포함)"""
+        digest = hashlib.blake2b(digest_size=16)
+        for path in self._data_files():
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(b'missing')
+        return digest.hexdigest()
+
+    def _stat_data_files(self):
+        stats = []
+        for path in self._data_files():
+            try:
+                st = os.stat(path)
+                stats.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stats.append(None)
+        return stats
+
+    def check_data_files(self):
+        """참조 데이터 파일 변경 여부를 주기적으로 확인하고, 바뀌었으면 백그라운드 재로드 시작"""
+        now = time.monotonic()
+        if now - self._data_checked_at < float(os.environ.get('DATA_CHECK_INTERVAL', 1.0)):
+            return False
+        self._data_checked_at = now
+        if self._stat_data_files() == self._data_stat:
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False   # 이미 재로드 중
+        threading.Thread(target=self._reload_locked, name='reference-reload', daemon=True).start()
+        return True
+
+    def reload(self):
+        """참조 데이터를 다시 읽어 새 스냅샷으로 교체 (내용이 같으면 유지)"""
+        with self._reload_lock:
+            return self._reload_locked(release=False)
+
+    def _reload_locked(self, release=True):
         try:
-            nltk.data.find('tokenizers/punkt')
-            nltk.data.find('corpora/stopwords')
-            nltk.data.find('taggers/averaged_perceptron_tagger')
-        except LookupError:
-            nltk.download('punkt')
-            nltk.download('stopwords')
-            nltk.download('averaged_perceptron_tagger')
-
-    def load_company_vision_data(self, base_dir):
-        """100대 기업 비전 데이터 로드"""
+            current = self._stat_data_files()
+            try:
+                if self._data_version() == self._snapshot.data_version:
+                    self._data_stat = current   # mtime만 바뀐 경우
+                    return False
+                snapshot = self.load_snapshot(strict=True, previous=self._snapshot)
+            except Exception as e:
+                # 쓰는 도중의 파일 등 읽기/검증 실패 시 이전 스냅샷 유지 (파일이 다시 바뀌면 재시도)
+                print(f"참조 데이터 재로드 실패, 이전 데이터 유지: {e}")
+                self._data_stat = current
+                return False
+
+            self._snapshot = snapshot
+            self._data_stat = snapshot.data_stat
+            self.result_cache.clear()
+            print(f"참조 데이터 재로드 완료 (버전 {snapshot.data_version[:8]})")
+            return True
+        finally:
+            if release:
+                self._reload_lock.release()
+
+    def start_data_watcher(self, interval=None):
+        """요청이 없어도 참조 데이터 변경을 주기적으로 확인하는 데몬 스레드 시작"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+        if interval is None:
+            interval = float(os.environ.get('DATA_WATCH_INTERVAL', 5.0))
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.check_data_files()
+                except Exception as e:
+                    print(f"참조 데이터 감시 오류: {e}")
+
+        self._watcher = threading.Thread(target=watch, name='reference-watcher', daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def load_reference_questions(self, questions_path):
+        """합격 자소서 원문 질문을 (직무, 직위, 카테고리, 질문) 목록으로 로드"""
+        if not questions_path:
+            return []
+        try:
+            df = pd.read_excel(questions_path, engine='openpyxl')
+        except Exception as e:
+            print(f"합격 자소서 원문 질문 로드 오류: {e}")
+            return []
+
+        questions = []
+        for job_title, position, question in zip(df['직무'], df['직위'], df['질문']):
+            question = self.clean_text(question)
+            category = self.get_category(question)
+            if category:
+                questions.append((job_title, position, category, question))
+        print(f"합격 자소서 원문 질문 {len(questions)}개를 검색 색인에 추가")
+        return questions
+
+    def load_company_vision_data(self, json_path, strict=False):
+        """100대 기업 비전 데이터 로드 -> (산업별 원본 데이터, 기업명-정보 맵)"""
         try:
-            json_path = os.path.join(base_dir, 'data', 'top_100_companies.json')
             with open(json_path, 'r', encoding='utf-8') as f:
-                self.company_vision_data = json.load(f)
+                company_vision_data = json.load(f)
             
             # 기업명-정보 맵 생성
-            self.company_info_map = {}
-            for industry, companies in self.company_vision_data.items():
+            company_info_map = {}
+            for industry, companies in company_vision_data.items():
                 for co in companies:
                     co['industry'] = industry
-                    self.company_info_map[co['name']] = co
+                    company_info_map[co['name']] = co
             
-            print(f"100대 기업 비전 데이터 로드 완료 ({len(self.company_info_map)}개 기업)")
+            print(f"100대 기업 비전 데이터 로드 완료 ({len(company_info_map)}개 기업)")
+            return company_vision_data, company_info_map
         except Exception as e:
+            if strict:
+                raise
             print(f"기업 비전 데이터 로드 오류: {e}")
-            self.company_info_map = {}
+            return {}, {}
 
     def clean_text(self, text):
         """텍스트 정제"""
@@ -72,50 +328,129 @@ class ResumeEvaluator:
         
         return text_str.strip()
 
+    def is_english(self, text):
+        """영문자 비율이 50%를 넘는지 판별"""
+        english_chars = len(re.findall(r'[a-zA-Z]', text))
+        total_chars = len(re.findall(r'[a-zA-Z가-힣]', text))
+        return english_chars / max(total_chars, 1) > 0.5
+
+    def keyword_text(self, text):
+        """키워드 추출용 텍스트 (특수문자 제거 및 공백 정리)"""
+        cleaned = re.sub(r'[^\w\s가-힣]', ' ', text)
+        return re.sub(r'\s+', ' ', cleaned).strip()
+
+    @timed(STAGE_SECONDS.labels('analyze'))
+    def analyze(self, answer, tokens=None, word_tokens=None):
+        """
+        답변을 한 번만 정제/형태소 분석하여 AnalyzedDocument 생성
+        tokens: keyword_text 분석 결과 (키워드 명사용), word_tokens: 정제 원문 분석 결과 (비전 테마 단어용)
+        """
+        text = self.clean_text(answer)
+        cleaned = self.keyword_text(text)
+        is_english = self.is_english(cleaned)
+
+        if is_english:
+            return AnalyzedDocument(text, True, self._english_words(text), self._english_keywords(cleaned))
+
+        try:
+            if tokens is None:
+                tokens = self.kiwi.tokenize(cleaned) if cleaned else []
+            nouns = [token.form for token in tokens if token.tag.startswith('N') and len(token.form) >= 2]
+            # 비전 테마 단어는 특수문자를 남긴 원문으로 분석 (괄호 등이 있으면 형태소 분리가 달라짐)
+            if word_tokens is None:
+                word_tokens = tokens if text == cleaned else self.kiwi.tokenize(text)
+            words = [token.form for token in word_tokens
+                     if token.tag.startswith(('N', 'V', 'J')) and len(token.form) >= 2]
+        except Exception:
+            words, nouns = [], []
+        return AnalyzedDocument(text, False, words, nouns)
+
+    def analyze_many(self, answers):
+        """여러 답변을 Kiwi 멀티스레드 배치로 분석하여 {답변: AnalyzedDocument} 반환"""
+        answers = list(dict.fromkeys(a for a in answers if isinstance(a, str)))
+        texts = [self.clean_text(a) for a in answers]
+        cleaned_texts = [self.keyword_text(t) for t in texts]
+        korean = [i for i, t in enumerate(cleaned_texts) if t and not self.is_english(t)]
+        # 특수문자가 있는 답변은 원문도 함께 분석 (비전 테마 단어용)
+        raw = [i for i in korean if texts[i] != cleaned_texts[i]]
+
+        token_lists = {}
+        word_token_lists = {}
+        batch = [cleaned_texts[i] for i in korean] + [texts[i] for i in raw]
+        if batch:
+            results = list(self.kiwi.tokenize(batch) if self.kiwi_batch else map(self.kiwi.tokenize, batch))
+            for i, tokens in zip(korean, results):
+                token_lists[i] = tokens
+                word_token_lists[i] = tokens
+            for i, tokens in zip(raw, results[len(korean):]):
+                word_token_lists[i] = tokens
+
+        return {answer: self.analyze(answer, token_lists.get(i), word_token_lists.get(i))
+                for i, answer in enumerate(answers)}
+
+    @timed(STAGE_SECONDS.labels('extract_words'))
     def extract_words(self, text):
         """텍스트에서 단어 추출 (Kiwi 사용)"""
         if pd.isna(text) or text == '':
             return []
         
         text = self.clean_text(text)
-        
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
-        total_chars = len(re.findall(r'[a-zA-Z가-힣]', text))
-        is_english = english_chars / max(total_chars, 1) > 0.5
 
-        if is_english:
-            cleaned = re.sub(r'[^\w\s]', ' ', text)
-            cleaned = re.sub(r'\s+', ' ', cleaned).strip().lower()
-            words = [word for word in cleaned.split() if len(word) >= 2 and word.isalpha()]
-            return words
+        # 반복되는 질문/핵심단어는 캐시에서 바로 반환 (Kiwi 재호출 방지)
+        words = token_cache.get_or_compute(text_key('resume.words', text), lambda: self._extract_words(text))
+        return list(words)
+
+    def _extract_words(self, text):
+        """extract_words 본체 (캐시 저장용 tuple 반환)"""
+        if self.is_english(text):
+            return tuple(self._english_words(text))
         else:
             try:
                 tokens = self.kiwi.tokenize(text)
-                words = [token.form for token in tokens
-                         if token.tag.startswith(('N', 'V', 'J')) and len(token.form) >= 2]
-                return words
+                return tuple(token.form for token in tokens
+                             if token.tag.startswith(('N', 'V', 'J')) and len(token.form) >= 2)
             except Exception as e:
-                return []
+                return ()
+
+    def _english_words(self, text):
+        """영문 텍스트 단어 분리 (2글자 이상 알파벳 단어)"""
+        cleaned = re.sub(r'[^\w\s]', ' ', text)
+        cleaned = re.sub(r'\s+', ' ', cleaned).strip().lower()
+        return [word for word in cleaned.split() if len(word) >= 2 and word.isalpha()]
+
+    def _company_keywords(self, text):
+        """기업 비전/핵심가치 키워드 (영문은 공백 분리만 사용해 시작 시 NLTK를 로드하지 않음)"""
+        text = self.clean_text(text)
+        if self.is_english(self.keyword_text(text)):
+            return [word for word in self._english_words(text) if word not in english_nlp.FALLBACK_STOPWORDS]
+        return self.analyze(text).nouns
+
+    def _english_keywords(self, cleaned_answer):
+        """영문 답변 키워드 후보 추출 (NLTK 품사 태깅, 실패 시 공백 분리)"""
+        # NLTK는 영문 답변을 처음 처리할 때 로드 (english_nlp)
+        english_stopwords = english_nlp.english_stopwords()
+
+        try:
+            tokens = english_nlp.word_tokenize(cleaned_answer.lower())
+            pos_tags = english_nlp.pos_tag(tokens)
+            return [word for word, pos in pos_tags 
+                    if pos.startswith(('NN', 'JJ', 'VB')) 
+                    and len(word) >= 2 
+                    and word not in english_stopwords
+                    and word.isalpha()]
+        except:
+            return [word.lower() for word in cleaned_answer.split() 
+                    if len(word) >= 2 and word.lower() not in english_stopwords and word.isalpha()]
 
     def get_category(self, text):
         """질문 텍스트가 어떤 핵심 카테고리에 속하는지 판별"""
-        text_lower = text.lower()
-        
-        # 카테고리별 탐색 키워드 목록
-        category_keywords = {
-            '지원동기': ['지원동기', '지원 동기', '회사선택', '선택한 이유', '왜 지원', '지원하게 된'],
-            '성장과정': ['성장과정', '성장 과정', '어린 시절', '가족관계', '학창시절'],
-            '장단점': ['장단점', '장점', '단점', '강점', '약점', '성격'],
-            '입사포부': ['입사포부', '입사 후 포부', '입사후포부', '미래계획', '비전', '목표', '10년 후', '기여할'],
-            '자기소개': ['자기소개', '자기 소개', '자신을 소개'],
-            '경험': ['경험', '도전', '극복', '협업', '리더십', '실패', '갈등', '문제해결', '성공', '팀워크', '소통', '프로젝트', '인턴'],
-            '직무역량': ['역량', '직무', '전공', '과목', '준비', '전문성', '수행', '기술'],
-            '가치관': ['가치관', '윤리의식', '도덕성', '인생관', '삶의 목표', '존경하는 인물']
-        }
-        
-        for cat, keywords in category_keywords.items():
+        # 텍스트에 나오는 키워드를 한 번에 찾은 뒤 카테고리 순서대로 첫 번째로 걸리는 카테고리 반환
+        found = CATEGORY_MATCHER.found(text.lower())
+        if not found:
+            return None
+        for cat, keywords in CATEGORY_KEYWORDS.items():
             for kw in keywords:
-                if kw in text_lower:
+                if kw in found:
                     return cat
         return None
 
@@ -125,8 +460,7 @@ class ResumeEvaluator:
         q2_cleaned = self.clean_text(q2)
 
         # q2가 핵심 카테고리 단어인 경우, q1을 해당 카테고리로 매핑하여 비교
-        categories = ['경험', '지원동기', '성장과정', '장단점', '입사포부', '자기소개', '직무역량', '가치관']
-        if q2_cleaned in categories:
+        if q2_cleaned in QUESTION_CATEGORIES:
             q1_cat = self.get_category(q1_cleaned)
             if q1_cat == q2_cleaned:
                 return 1.0
@@ -150,111 +484,72 @@ class ResumeEvaluator:
 
     def find_best_matching_question(self, user_question, job_title, position):
         """사용자 질문과 가장 유사한 합격 자소서 질문 찾기 (다단계 매칭Fallback 적용)"""
-        # 1단계: 특정 직무 + 특정 직위 매칭
-        filtered_df = self.reference_df[
-            (self.reference_df['직무'] == job_title) & 
-            (self.reference_df['직위'] == position)
-        ]
-        best_match_keyword, max_similarity, best_match_data = self._find_best_in_df(user_question, filtered_df)
-        
-        # 2단계: 직무만 일치하는 경우 (인턴/신입 등 직위 통합)
-        if best_match_data is None or max_similarity < 0.2:
-            filtered_df_job = self.reference_df[self.reference_df['직무'] == job_title]
-            k, s, d = self._find_best_in_df(user_question, filtered_df_job)
-            if d is not None and s > max_similarity:
-                best_match_keyword, max_similarity, best_match_data = k, s, d
-                
-        # 3단계: 전체 데이터에서 공통 질문 유형 매칭 (지원동기, 포부 등 공통 항목)
-        if best_match_data is None or max_similarity < 0.2:
-            k, s, d = self._find_best_in_df(user_question, self.reference_df)
-            if d is not None and s > max_similarity:
-                best_match_keyword, max_similarity, best_match_data = k, s, d
-        
-        return best_match_keyword, max_similarity, best_match_data
+        best_entry, max_similarity = self._match_reference(user_question, job_title, position)
+        if best_entry is None:
+            return None, max_similarity, None
+        return best_entry.keyword, max_similarity, best_entry
 
-    def _find_best_in_df(self, user_question, df):
-        """데이터프레임 내에서 최적의 매칭 질문 검색"""
-        if df is None or df.empty:
-            return None, 0, None
-        
-        max_similarity = 0
-        best_match_keyword = None
-        best_match_data = None
-        
-        for idx, row in df.iterrows():
-            if pd.isna(row['핵심단어']):
-                continue
-                
-            similarity = self.word_based_similarity(user_question, row['핵심단어'])
-            if similarity > max_similarity:
-                max_similarity = similarity
-                best_match_keyword = row['핵심단어']
-                best_match_data = row
-        
-        return best_match_keyword, max_similarity, best_match_data
+    @timed(STAGE_SECONDS.labels('match_reference'))
+    def _match_reference(self, user_question, job_title, position, snapshot=None):
+        """색인에서 직무+직위 -> 직무 -> 전체 순서로 최적 참조 항목 검색"""
+        snapshot = snapshot or self._snapshot
+        question_text = self.clean_text(user_question)
+        query = ReferenceQuery(question_text, self.get_category(question_text), self.extract_words)
+        best_entry, max_similarity, level = snapshot.reference_index.match(query, job_title, position)
+        MATCH_LEVELS.labels(ReferenceIndex.LEVELS[level]).inc()
+        return best_entry, max_similarity
+
+    def search_reference_questions(self, user_question, job_title, position, top_k=5):
+        """BM25 역색인으로 유사한 참조 질문 상위 top_k개 검색 (직무/직위 단계별 보충)"""
+        question_text = self.clean_text(user_question)
+        query = ReferenceQuery(question_text, self.get_category(question_text), self.extract_words)
+        return [{
+            '핵심단어': entry.keyword,
+            '직무': entry.job_title,
+            '직위': entry.position,
+            '점수': round(score, 4)
+        } for entry, score in self.reference_index.search(query, job_title, position, top_k)]
 
     def extract_keywords_multilingual(self, answers, top_n=20):
         """한국어/영어 키워드 추출"""
         korean_nouns = []
         english_words = []
         
-        try:
-            english_stopwords = set(stopwords.words('english'))
-        except:
-            english_stopwords = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
-        
         for answer in answers:
-            if pd.isna(answer) or answer == '':
+            if isinstance(answer, AnalyzedDocument):
+                document = answer
+            elif pd.isna(answer) or answer == '':
                 continue
+            else:
+                document = self.analyze(answer)
             
-            answer_text = self.clean_text(answer)
-            cleaned_answer = re.sub(r'[^\w\s가-힣]', ' ', answer_text)
-            cleaned_answer = re.sub(r'\s+', ' ', cleaned_answer).strip()
-            
-            english_chars = len(re.findall(r'[a-zA-Z]', cleaned_answer))
-            total_chars = len(re.findall(r'[a-zA-Z가-힣]', cleaned_answer))
-            is_english = english_chars / max(total_chars, 1) > 0.5
-            
-            if is_english:
-                try:
-                    tokens = word_tokenize(cleaned_answer.lower())
-                    pos_tags = pos_tag(tokens)
-                    words = [word for word, pos in pos_tags 
-                            if pos.startswith(('NN', 'JJ', 'VB')) 
-                            and len(word) >= 2 
-                            and word not in english_stopwords
-                            and word.isalpha()]
-                    english_words.extend(words)
-                except:
-                    words = [word.lower() for word in cleaned_answer.split() 
-                            if len(word) >= 2 and word.lower() not in english_stopwords and word.isalpha()]
-                    english_words.extend(words)
+            if document.is_english:
+                english_words.extend(document.nouns)
             else:
-                try:
-                    tokens = self.kiwi.tokenize(cleaned_answer)
-                    nouns = [token.form for token in tokens 
-                            if token.tag.startswith('N') and len(token.form) >= 2]
-                    korean_nouns.extend(nouns)
-                except:
-                    continue
+                korean_nouns.extend(document.nouns)
         
         all_words = korean_nouns + english_words
         if not all_words: return []
         counter = Counter(all_words)
         return [word for word, count in counter.most_common(top_n)]
 
+    @timed(STAGE_SECONDS.labels('keyword_score'))
     def calculate_keyword_matching_score(self, user_answer, reference_keywords):
-        """키워드 매칭 점수 계산"""
-        # 사용자 답변에서 키워드 추출 (매칭 품질을 위해 상위 100개로 확대)
-        user_keywords = self.extract_keywords_multilingual([user_answer], top_n=100)
-        
-        if not reference_keywords or pd.isna(reference_keywords):
+        """키워드 매칭 점수 계산 (user_answer: 답변 문자열 또는 AnalyzedDocument)"""
+        # 색인에서 미리 분리된 키워드 집합이 오면 그대로 사용
+        if isinstance(reference_keywords, (set, frozenset)):
+            reference_keyword_set = reference_keywords
+        elif not reference_keywords or pd.isna(reference_keywords):
+            return 0.0, []
+        else:
+            # CSV의 답변 키워드는 쉼표로 구분된 문자열
+            reference_keyword_set = set(kw.strip() for kw in str(reference_keywords).split(','))
+        if not reference_keyword_set:
             return 0.0, []
         
-        # CSV의 답변 키워드는 쉼표로 구분된 문자열
-        reference_keyword_list = [kw.strip() for kw in str(reference_keywords).split(',')]
-        reference_keyword_set = set(reference_keyword_list)
-        user_keyword_set = set(user_keywords)
+        # 사용자 답변에서 키워드 추출 (매칭 품질을 위해 상위 100개로 확대)
+        document = user_answer if isinstance(user_answer, AnalyzedDocument) else self.analyze(user_answer)
+        user_keyword_set = set(word for word, count in document.noun_counts.most_common(100))
         
         # 교집합 추출
         matched_keywords = user_keyword_set.intersection(reference_keyword_set)
@@ -269,135 +564,515 @@ class ResumeEvaluator:
         
         return score, list(matched_keywords)
 
-    def calculate_vision_alignment_score(self, user_answer, company_name):
+    @timed(STAGE_SECONDS.labels('vision_score'))
+    def calculate_vision_alignment_score(self, user_answer, company_name, snapshot=None):
         """
         회사 비전 및 성향 정합성 분석 (단순 키워드 -> 서사 구조 분석)
+        user_answer: 답변 문자열 또는 AnalyzedDocument
         """
-        if not company_name or company_name not in self.company_info_map:
+        company_info_map = (snapshot or self._snapshot).company_info_map
+        if not company_name or company_name not in company_info_map:
             return 0.0, []
         
-        company_info = self.company_info_map[company_name]
-        vision_text = company_info['vision']
-        core_values = company_info['core_values']
-        
-        # 1. 성향 테마 정의 (비전/핵심가치 기반)
-        disposition_themes = {
-            "기술/혁신": ["기술", "혁신", "초격차", "R&D", "품질", "엔지니어", "전문성", "자부심"],
-            "미래/선도": ["미래", "선도", "글로벌", "최고", "변화", "이끌다", "앞서가다", "시장"],
-            "인재/협력": ["인재", "협력", "상생", "소통", "팀워크", "공헌", "사람", "성장"],
-            "실행/도전": ["도전", "실행", "열정", "완수", "책임", "끈기", "목표", "달성"]
-        }
-        
-        # 2. 서사 구조 패턴 분석 (Storyline Alignment)
-        narrative_patterns = {
-            "경험_근거": [r"(.+?)(바탕으로|통해|경험하며|수행하며|과정에서)"],
-            "기술_자부심": [r"(.+?)(역량을|자부심을|기술력을|전문성을)"],
-            "비전_지향": [r"(.+?)(이끌어|선도하는|기여하는|목표로|실현하기 위해)"]
-        }
-        
-        user_words = self.extract_words(user_answer)
-        user_text = self.clean_text(user_answer)
+        document = user_answer if isinstance(user_answer, AnalyzedDocument) else self.analyze(user_answer)
+        return self._vision_alignment(document)
+
+    def _vision_alignment(self, document):
+        """비전 성향 테마/서사 구조/액션 동사 점수 (기업과 무관한 공통 부분)"""
+        # 1. 성향 테마 / 2. 서사 구조 패턴 정의는 모듈 상단 (DISPOSITION_THEMES, NARRATIVE_PATTERNS)
+        user_words = document.words
+        user_text = document.text
         
         # 3. 점수 산출 로직
         disposition_score = 0
         matched_themes = []
         
         # 3-1. 테마 적합도
-        for theme, keywords in disposition_themes.items():
-            match_count = len([w for w in user_words if w in keywords])
-            if match_count >= 1:
+        user_word_set = set(user_words)
+        for theme, keywords in DISPOSITION_THEME_SETS.items():
+            if not user_word_set.isdisjoint(keywords):
                 disposition_score += 15
                 matched_themes.append(theme)
         
+        # 서사 연결어와 액션 동사 출현을 한 번에 수집
+        narratives = set()
+        verbs = set()
+        for pos, keyword in VISION_MATCHER.finditer(user_text):
+            group = NARRATIVE_GROUPS.get(keyword)
+            if group is None:
+                verbs.add(keyword)
+            elif pos > 0 and user_text[pos - 1] != '\n':
+                narratives.add(group)
+        
         # 3-2. 서사 구조 완성도
-        pattern_score = 0
-        for pattern_name, regex_list in narrative_patterns.items():
-            for regex in regex_list:
-                if re.search(regex, user_text):
-                    pattern_score += 15
-                    break
+        pattern_score = 15 * len(narratives)
         
         # 3-3. 비전 액션 동사 매칭
-        action_verbs = ["이끌다", "선도하다", "기여하다", "혁신하다", "창출하다", "실현하다", "완수하다"]
-        action_match = len([v for v in action_verbs if v in user_text])
-        action_score = min(action_match * 5, 10)
+        matched_verbs = [v for v in ACTION_VERBS if v in verbs]
+        action_score = min(len(matched_verbs) * 5, 10)
         
         total_vision_score = min(disposition_score + pattern_score + action_score, 100)
-        result_keywords = matched_themes + [v for v in action_verbs if v in user_text]
+        result_keywords = matched_themes + matched_verbs
             
         return total_vision_score, result_keywords
 
-    def evaluate_resume(self, user_data):
-        """사용자 자소서 평가"""
+    def _question_cache_key(self, company_name, job_title, position, question, answer, snapshot=None):
+        """(데이터 버전, 회사명, 직무, 직위, 질문, 답변) 내용 기반 캐시 키"""
+        data_version = (snapshot or self._snapshot).data_version
+        payload = json.dumps([data_version, company_name, job_title, position, question, answer],
+                             ensure_ascii=False, default=str)
+        return text_key('result', payload)
+
+    def _score_question(self, company_name, job_title, position, user_question, user_answer, documents=None,
+                        snapshot=None):
+        """문항 하나의 매칭 질문/키워드/비전 점수 계산"""
+        best_entry, _ = self._match_reference(user_question, job_title, position, snapshot)
+        best_keyword = best_entry.keyword if best_entry is not None else None
+        
+        # 답변은 한 번만 분석하여 키워드/비전 점수 계산에서 공유
+        document = None
+        if best_entry is not None or company_name:
+            if documents is not None and isinstance(user_answer, str):
+                document = documents.get(user_answer)
+            if document is None:
+                document = self.analyze(user_answer)
+        
+        keyword_score = 0
+        matched_essay_keywords = []
+        if best_entry is not None:
+            keyword_score, matched_essay_keywords = self.calculate_keyword_matching_score(
+                document, best_entry.answer_keywords
+            )
+        
+        vision_score = 0
+        matched_vision_keywords = []
+        if company_name:
+            vision_score, matched_vision_keywords = self.calculate_vision_alignment_score(
+                document, company_name, snapshot
+            )
+        
+        total_score = (keyword_score * 0.7) + (vision_score * 0.3)
+        
+        return {
+            '가장유사한질문': best_keyword if best_keyword else 'N/A',
+            '매칭된합격키워드': ', '.join(matched_essay_keywords),
+            '매칭된비전키워드': ', '.join(matched_vision_keywords),
+            '합격키워드점수': round(keyword_score, 1),
+            '비전정합성점수': round(vision_score, 1),
+            '문항종합점수': round(total_score, 1)
+        }
+
+    @timed(STAGE_SECONDS.labels('evaluate_resume'))
+    def evaluate_resume(self, user_data, documents=None, deadline=None):
+        """
+        사용자 자소서 평가 (documents: evaluate_many에서 미리 분석한 {답변: AnalyzedDocument},
+        deadline: time.monotonic() 기준 마감 시각, 지나면 남은 문항을 계산하지 않고 DeadlineExceeded)
+        """
+        results = list(self.iter_evaluate_resume(user_data, documents, deadline))
+        summary = results.pop()
+        summary['상세결과'] = results
+        return summary
+
+    def iter_evaluate_resume(self, user_data, documents=None, deadline=None):
+        """
+        문항별 결과를 채점되는 즉시 하나씩 내보내고, 마지막에 요약(회사명, 산업분야, 평균점수, 등급)을 내보내는 제너레이터
+        (입력 형식 오류는 제너레이터를 만들 때 바로 발생)
+        """
         company_name = user_data.get('회사명', '')
         job_title = user_data['직무']
         position = user_data['직위']
         qa_pairs = user_data['qa_pairs']
+        if not qa_pairs:
+            raise ValueError('qa_pairs가 비어 있습니다')
         
-        evaluation_results = []
-        
+        EVALUATIONS.inc()
+        QUESTIONS.inc(len(qa_pairs))
+        self.check_data_files()
+        # 평가 도중 참조 데이터가 교체되어도 이 요청은 시작 시점의 스냅샷으로 끝까지 계산
+        snapshot = self._snapshot
+        return self._iter_scores(company_name, job_title, position, qa_pairs, documents, snapshot, deadline)
+
+    def _iter_scores(self, company_name, job_title, position, qa_pairs, documents, snapshot, deadline=None):
+        total_score = 0.0
         for i, qa in enumerate(qa_pairs):
+            check_deadline(deadline)
             user_question = qa['question']
             user_answer = qa['answer']
             
-            best_keyword, _, best_data = self.find_best_matching_question(
-                user_question, job_title, position
-            )
-            
-            keyword_score = 0
-            matched_essay_keywords = []
-            if best_data is not None:
-                keyword_score, matched_essay_keywords = self.calculate_keyword_matching_score(
-                    user_answer, best_data['답변키워드_TOP20']
-                )
+            # 같은 문항이 다시 제출되면 캐시된 점수를 그대로 사용 (답변 하나만 고치면 그 문항만 재계산)
+            cache_key = self._question_cache_key(company_name, job_title, position, user_question, user_answer,
+                                                 snapshot)
+            scored = self.result_cache.get(cache_key)
+            if scored is None:
+                scored = self._score_question(company_name, job_title, position, user_question, user_answer,
+                                              documents, snapshot)
+                self.result_cache.put(cache_key, scored)
             
-            vision_score = 0
-            matched_vision_keywords = []
-            if company_name:
-                vision_score, matched_vision_keywords = self.calculate_vision_alignment_score(
-                    user_answer, company_name
-                )
-            
-            total_score = (keyword_score * 0.7) + (vision_score * 0.3)
-            
-            evaluation_results.append({
-                '질문번호': i + 1,
-                '사용자질문': user_question,
-                '가장유사한질문': best_keyword if best_keyword else 'N/A',
-                '매칭된합격키워드': ', '.join(matched_essay_keywords),
-                '매칭된비전키워드': ', '.join(matched_vision_keywords),
-                '합격키워드점수': round(keyword_score, 1),
-                '비전정합성점수': round(vision_score, 1),
-                '문항종합점수': round(total_score, 1)
-            })
-        
-        result_df = pd.DataFrame(evaluation_results)
-        average_score = result_df['문항종합점수'].mean()
+            result = {'질문번호': i + 1, '사용자질문': user_question}
+            result.update(scored)
+            total_score += scored['문항종합점수']
+            yield result
         
-        if average_score >= 80: grade = "우수 (S)"
-        elif average_score >= 60: grade = "보통 (A)"
-        elif average_score >= 40: grade = "미흡 (B)"
-        else: grade = "부족 (C)"
-        
-        return {
+        average_score = total_score / len(qa_pairs)
+        yield {
             '회사명': company_name,
-            '산업분야': self.company_info_map.get(company_name, {}).get('industry', '기타'),
+            '산업분야': snapshot.company_info_map.get(company_name, {}).get('industry', '기타'),
             '평균점수': round(average_score, 1),
-            '등급': grade,
-            '상세결과': evaluation_results
+            '등급': grade_for(average_score)
         }
 
+    def rank_companies(self, qa_pairs, industries=None, top_k=None, deadline=None):
+        """
+        답변을 한 번만 분석해 100대 기업 전체(또는 산업분야 필터)와의 적합도 순위 계산
+        industries: 산업분야 이름 또는 목록 (없으면 전체)
+        """
+        if isinstance(industries, str):
+            industries = [industries]
+        snapshot = self._snapshot
+        company_index = snapshot.company_index
+        if industries:
+            unknown = [industry for industry in industries if industry not in company_index.industries]
+            if unknown:
+                raise ValueError(f"알 수 없는 산업분야: {', '.join(unknown)}")
+
+        answers = [qa['answer'] for qa in qa_pairs]
+        if not answers:
+            raise ValueError('qa_pairs가 비어 있습니다')
+        documents = self.analyze_many(answers)
+        analyzed = [documents.get(answer) or self.analyze(answer) for answer in answers]
+        check_deadline(deadline)
+
+        # 성향/서사 점수는 기업과 무관하므로 답변별로 한 번만 계산
+        vision_score = sum(self._vision_alignment(document)[0] for document in analyzed) / len(analyzed)
+
+        found = company_index.match(document.text for document in analyzed)
+        ranked = company_index.rank(found, industries)
+        if top_k:
+            ranked = ranked[:top_k]
+        return {
+            '산업분야': industries or company_index.industries,
+            '비전정합성점수': round(vision_score, 1),
+            '기업수': len(ranked),
+            '순위': [{
+                '순위': rank,
+                '회사명': profile.name,
+                '산업분야': profile.industry,
+                '기업적합도점수': round(score, 1),
+                '매칭된기업키워드': ', '.join(matched)
+            } for rank, (profile, matched, score) in enumerate(ranked, 1)]
+        }
+
+    def evaluate_many(self, user_data_list, deadline=None):
+        """
+        여러 자소서 일괄 평가 (전체 답변을 한 번의 Kiwi 배치로 분석, 입력 순서대로 결과 반환)
+        자소서별 입력 오류는 {'error'}로 채우고, 마감 시간이 지나면 일부 결과 없이 DeadlineExceeded
+        """
+        self.check_data_files()
+        answers = []
+        for user_data in user_data_list:
+            try:
+                company_name = user_data.get('회사명', '')
+                for qa in user_data.get('qa_pairs') or []:
+                    if not isinstance(qa, dict):
+                        continue
+                    # 결과 캐시에 있는 문항은 분석할 필요 없음
+                    cache_key = self._question_cache_key(
+                        company_name, user_data.get('직무'), user_data.get('직위'), qa.get('question'), qa.get('answer')
+                    )
+                    if not self.result_cache.contains(cache_key):
+                        answers.append(qa.get('answer'))
+            except (AttributeError, TypeError):
+                continue
+
+        # 모든 답변을 한 번의 배치로 분석한 뒤 자소서별로 점수 계산
+        documents = self.analyze_many(answers)
+
+        results = []
+        for user_data in user_data_list:
+            try:
+                results.append(self.evaluate_resume(user_data, documents, deadline))
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                results.append({'error': str(e)})
+        return results
+
+# 프로세스 전역 평가기 (Kiwi 모델, 참조 CSV, 기업 데이터를 한 번만 로드)
+_evaluator = None
+_evaluator_lock = threading.Lock()
+
+def get_evaluator():
+    """공유 평가기 반환 (최초 호출 시 한 번만 로드)"""
+    global _evaluator
+    if _evaluator is None:
+        with _evaluator_lock:
+            if _evaluator is None:
+                _evaluator = ResumeEvaluator()
+    return _evaluator
+
+def is_evaluator_loaded():
+    """공유 평가기 로드 완료 여부"""
+    return _evaluator is not None
+
+def _cache_lookups():
+    """형태소/결과 캐시 적중/미스 누적 횟수 (지표 수집 시점에 읽음)"""
+    caches = {'token': token_cache}
+    if is_evaluator_loaded():
+        caches['result'] = _evaluator.result_cache
+    values = {}
+    for name, cache in caches.items():
+        stats = cache.stats()
+        values[(name, 'hit')] = stats['hits']
+        values[(name, 'miss')] = stats['misses']
+    return values
+
+metrics.CallbackMetric('resume_cache_lookups_total', '캐시 조회 횟수 (적중/미스)', 'counter',
+                       _cache_lookups, ['cache', 'result'])
+
+# 유사 합격 자소서 검색 색인 (essay_index.py build로 미리 생성, 시작 시 로드)
+_essay_index = None
+_essay_index_lock = threading.Lock()
+
+def get_essay_index():
+    """공유 합격 자소서 MinHash 색인 반환 (색인 파일이 없으면 None)"""
+    global _essay_index
+    if _essay_index is None:
+        with _essay_index_lock:
+            index_path = os.environ.get('ESSAY_INDEX_PATH', DEFAULT_INDEX_PATH)
+            if _essay_index is None and os.path.exists(index_path):
+                _essay_index = EssayIndex.load(index_path)
+                print(f"합격 자소서 유사도 색인 로드 완료 ({len(_essay_index.essays)}개 답변)")
+    return _essay_index
+
+# 워밍업용 합성 자소서 (Kiwi 모델 지연 로드와 평가 경로 초기화를 요청 전에 끝냄)
+WARMUP_RESUME = {
+    '회사명': '삼성전자',
+    '직무': 'IT·기술영업',
+    '직위': '신입',
+    'qa_pairs': [
+        {'question': '지원동기와 입사 후 포부를 기술해 주십시오.',
+         'answer': '프로젝트 경험을 바탕으로 고객에게 필요한 기술을 제안하며 시장을 선도하는 데 기여하고 싶습니다.'},
+        {'question': '본인의 장단점을 기술해 주십시오.',
+         'answer': '팀워크와 소통을 통해 목표를 달성하는 끈기가 강점이며, 꼼꼼함을 기르기 위해 노력하고 있습니다.'}
+    ]
+}
+
+_ready = False
+
+def warm_up():
+    """합성 자소서로 평가/검색 경로를 한 번 실행한 뒤 준비 완료로 표시"""
+    global _ready
+    evaluator = get_evaluator()
+    evaluator.evaluate_resume(WARMUP_RESUME)
+    index = get_essay_index()
+    if index is not None:
+        index.query(evaluator.analyze(WARMUP_RESUME['qa_pairs'][0]['answer']).nouns, 1)
+    _ready = True
+
+def is_ready():
+    """워밍업까지 끝나 요청을 받을 준비가 되었는지 여부"""
+    return _ready
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    return jsonify({'ready': is_ready()}), 200 if is_ready() else 503
+
+@app.route('/health', methods=['GET'])
+def health():
+    loaded = is_evaluator_loaded()
+    body = {'status': 'ok' if loaded else 'loading', 'loaded': loaded, 'token_cache': token_cache.stats()}
+    if loaded:
+        evaluator = get_evaluator()
+        body['result_cache'] = evaluator.result_cache.stats()
+        body['data_version'] = evaluator.data_version
+    body['admission'] = admission.stats()
+    return jsonify(body), 200 if loaded else 503
+
+# 평가 요청 수락 제어 (동시 처리 수/대기열 크기/대기 시간은 환경변수로 설정)
+admission = AdmissionController.from_env()
+
+# 요청 마감 시간 기본값 (초), 클라이언트는 X-Request-Timeout 헤더로 더 짧게 지정 가능
+EVALUATE_DEADLINE = float(os.environ.get('EVALUATE_DEADLINE', 30))
+
+def request_deadline():
+    timeout = EVALUATE_DEADLINE
+    try:
+        timeout = min(timeout, float(request.headers.get('X-Request-Timeout', timeout)))
+    except ValueError:
+        pass
+    return time.monotonic() + timeout
+
+def parse_top_k(value, default=None, maximum=None):
+    """요청의 top_k 검증 (1 이상 정수, 잘못된 값은 ValueError -> 400)"""
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().isdigit():
+        raise ValueError('top_k는 1 이상의 정수여야 합니다')
+    top_k = int(value)
+    if top_k < 1:
+        raise ValueError('top_k는 1 이상의 정수여야 합니다')
+    if maximum is not None and top_k > maximum:
+        raise ValueError(f'top_k는 {maximum} 이하여야 합니다')
+    return top_k
+
+@app.errorhandler(Overloaded)
+def handle_overloaded(e):
+    response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+@app.errorhandler(DeadlineExceeded)
+def handle_deadline_exceeded(e):
+    return jsonify({'error': str(e)}), 504
+
+def _admission_stats():
+    stats = admission.stats()
+    return {('in_flight',): stats['in_flight'], ('queued',): stats['queued']}
+
+def _admission_results():
+    stats = admission.stats()
+    return {(key,): stats[key] for key in
+            ('admitted', 'rejected_queue_full', 'rejected_queue_timeout', 'deadline_exceeded')}
+
+metrics.CallbackMetric('resume_admission_requests', '처리 중/대기 중인 평가 요청 수', 'gauge',
+                       _admission_stats, ['state'])
+metrics.CallbackMetric('resume_admission_total', '평가 요청 수락/거절/마감 초과 횟수', 'counter',
+                       _admission_results, ['result'])
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
+
 @app.route('/evaluate', methods=['POST'])
 def evaluate_resume():
     try:
         data = request.get_json()
-        evaluator = ResumeEvaluator()
-        result = evaluator.evaluate_resume(data)
+        evaluator = get_evaluator()
+        deadline = request_deadline()
+        with admission.slot(deadline):
+            result = evaluator.evaluate_resume(data, deadline=deadline)
         if result is None: return jsonify({'error': '평가 실패'}), 400
         return jsonify(result)
+    except (Overloaded, DeadlineExceeded):
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/evaluate/stream', methods=['POST'])
+def evaluate_resume_stream():
+    """/evaluate와 같은 입력, 문항별 결과를 한 줄씩(NDJSON) 보낸 뒤 마지막 줄에 요약 전송"""
+    deadline = request_deadline()
+    # 슬롯은 응답을 시작하기 전에 잡고(가득 차면 503), 스트림이 끝나거나 끊기면 반납
+    admission.acquire(deadline)
+    start = time.monotonic()
+    released = []
+
+    def release(exceeded=False):
+        if not released:
+            released.append(True)
+            admission.release(time.monotonic() - start, exceeded)
+
+    try:
+        data = request.get_json()
+        events = get_evaluator().iter_evaluate_resume(data, deadline=deadline)
+    except Exception as e:
+        release()
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        try:
+            for event in events:
+                yield json.dumps(event, ensure_ascii=False) + '\n'
+        except Exception as e:
+            # 이미 응답이 시작되었으므로 오류도 한 줄로 전달
+            release(isinstance(e, DeadlineExceeded))
+            yield json.dumps({'error': str(e)}, ensure_ascii=False) + '\n'
+        finally:
+            release()
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                        headers={'X-Accel-Buffering': 'no'})
+    # 본문을 한 번도 읽지 않고 연결이 닫혀도 슬롯 반납
+    response.call_on_close(release)
+    return response
+
+@app.route('/evaluate/companies', methods=['POST'])
+def rank_companies():
+    """한 자소서를 100대 기업 전체와 비교한 적합도 순위 (산업분야 필터, top_k 선택)"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': '요청 본문은 JSON 객체여야 합니다'}), 400
+        top_k = parse_top_k(data.get('top_k'))
+        deadline = request_deadline()
+        with admission.slot(deadline):
+            result = get_evaluator().rank_companies(data['qa_pairs'], data.get('산업분야'), top_k, deadline)
+        return jsonify(result)
+    except (Overloaded, DeadlineExceeded):
+        raise
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/reference/search', methods=['POST'])
+def search_reference_questions():
+    try:
+        data = request.get_json()
+        results = get_evaluator().search_reference_questions(
+            data['question'], data.get('직무'), data.get('직위'), int(data.get('top_k', 5))
+        )
+        return jsonify({'results': results})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/similar-essays', methods=['POST'])
+def similar_essays():
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('answer'), str):
+            return jsonify({'error': 'answer 문자열이 필요합니다'}), 400
+        try:
+            top_k = parse_top_k(data.get('top_k'), default=5, maximum=50)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        index = get_essay_index()
+        if index is None:
+            return jsonify({'error': '유사 자소서 색인이 없습니다 (python essay_index.py build)'}), 503
+        document = get_evaluator().analyze(data['answer'])
+        results = [dict(essay, 유사도=round(similarity, 4)) for essay, similarity in index.query(document.nouns, top_k)]
+        return jsonify({'results': results})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# 한 번의 배치 요청으로 받을 수 있는 최대 자소서 수
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 500))
+
+@app.route('/evaluate/batch', methods=['POST'])
+def evaluate_resume_batch():
+    try:
+        data = request.get_json()
+        resumes = data.get('resumes') if isinstance(data, dict) else data
+        if not isinstance(resumes, list):
+            return jsonify({'error': 'resumes 목록이 필요합니다'}), 400
+        if len(resumes) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'한 번에 최대 {MAX_BATCH_SIZE}개까지 평가할 수 있습니다'}), 413
+        deadline = request_deadline()
+        with admission.slot(deadline):
+            results = get_evaluator().evaluate_many(resumes, deadline)
+        return jsonify({'results': results})
+    except (Overloaded, DeadlineExceeded):
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5002))
-    app.run(host='0.0.0.0', port=port)
+    # 요청을 받기 전에 평가기를 미리 로드 (첫 요청 지연 방지)
+    # 멀티 프로세스 운영 환경에서는 server.py 사용
+    get_evaluator()
+    get_essay_index()
+    warm_up()
+    # 참조 CSV/기업 데이터가 바뀌면 재시작 없이 백그라운드에서 다시 읽어 교체
+    get_evaluator().start_data_watcher()
+    app.run(host='0.0.0.0', port=port, threaded=True)
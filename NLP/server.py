@@ -0,0 +1,250 @@
+# server.py
+"""
+자소서 평가 서버 운영 모드 (pre-fork 멀티 프로세스)
+
+부모 프로세스가 Kiwi 모델, 참조 CSV, 기업 데이터, 유사 자소서 색인을 한 번만 로드하고
+합성 자소서로 워밍업한 뒤 --workers개 워커를 fork합니다. 워커들은 같은 리스닝 소켓을
+공유하며, 로드된 데이터는 copy-on-write로 공유됩니다 (fork 전에 gc.freeze()로
+GC가 공유 페이지를 건드리지 않도록 고정).
+
+    python server.py --workers 8 --port 5002
+
+워커 수 기본값은 이 프로세스가 실제로 쓸 수 있는 CPU 수입니다 (CPU affinity와 컨테이너의
+cgroup CPU 제한 반영). SIGTERM을 받으면 워커는 새 연결을 받지 않고 처리 중인 요청이 끝날 때까지
+(최대 GRACEFUL_TIMEOUT초) 기다린 뒤 종료하므로 롤링 재시작 중에도 요청이 끊기지 않습니다.
+
+준비 상태는 GET /ready, 로드 상태는 GET /health로 확인합니다.
+참조 CSV/기업 JSON이 바뀌면 각 워커가 백그라운드에서 다시 읽어 교체합니다 (재시작 불필요,
+재로드된 데이터는 워커별 메모리를 사용).
+fork를 지원하지 않는 환경(Windows)에서는 단일 프로세스로 실행됩니다.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+import resume_evaluator
+
+
+# 종료 신호를 받은 워커가 처리 중인 요청을 기다리는 최대 시간 (초)
+GRACEFUL_TIMEOUT = float(os.environ.get('GRACEFUL_TIMEOUT', 25))
+
+
+def available_cpus():
+    """이 프로세스가 쓸 수 있는 CPU 수 (affinity와 cgroup v2/v1 CPU quota 중 작은 값)"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    quota = None
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            limit, period = f.read().split()[:2]
+        if limit != 'max':
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                limit = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = int(f.read())
+            if limit > 0 and period > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota is not None:
+        count = min(count, max(1, int(quota)))
+    return max(1, count)
+
+
+class InFlightTracker:
+    """
+    처리 중인 요청 수를 세는 WSGI 래퍼 (스트리밍 응답은 본문을 다 보내거나 닫힐 때까지 처리 중)
+    attach(server) 후에는 받아들였지만 아직 앱에 도착하지 않은 연결의 첫 요청도 처리 중으로 셈
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self.in_flight = 0
+
+    def attach(self, server):
+        """스레드 서버가 연결을 받는 시점부터 세도록 process_request/process_request_thread 감쌈"""
+        process_request = server.process_request
+        process_request_thread = server.process_request_thread
+
+        def accepted(request, client_address):
+            with self._cond:
+                self.in_flight += 1
+            process_request(request, client_address)
+
+        def handle(request, client_address):
+            self._local.pending = True
+            try:
+                process_request_thread(request, client_address)
+            finally:
+                # 요청 없이 닫힌 연결
+                if self._local.pending:
+                    self._local.pending = False
+                    self._done()
+
+        server.process_request = accepted
+        server.process_request_thread = handle
+
+    def __call__(self, environ, start_response):
+        if getattr(self._local, 'pending', False):
+            # 연결을 받을 때 이미 센 첫 요청
+            self._local.pending = False
+        else:
+            with self._cond:
+                self.in_flight += 1
+        try:
+            body = self.app(environ, start_response)
+        except BaseException:
+            self._done()
+            raise
+        return _ClosingIterator(body, self._done)
+
+    def _done(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def wait_idle(self, timeout):
+        """처리 중인 요청이 모두 끝날 때까지 대기 (시간 안에 끝났으면 True)"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.in_flight == 0, timeout)
+
+
+class _ClosingIterator:
+    def __init__(self, body, on_close):
+        self._body = body
+        self._iter = iter(body)
+        self._on_close = on_close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iter)
+
+    def close(self):
+        try:
+            if hasattr(self._body, 'close'):
+                self._body.close()
+        finally:
+            self._on_close()
+
+
+def serve_worker(sock, host, port):
+    """워커 프로세스: 상속받은 소켓으로 요청 처리, SIGTERM이면 처리 중인 요청을 마치고 종료"""
+    # 스레드는 fork로 상속되지 않으므로 데이터 변경 감시는 워커마다 시작
+    resume_evaluator.get_evaluator().start_data_watcher()
+    tracker = InFlightTracker(resume_evaluator.app)
+    server = make_server(host, port, tracker, threaded=True, fd=sock.fileno())
+    tracker.attach(server)
+
+    def drain(signum, frame):
+        # shutdown()은 serve_forever 루프가 끝날 때까지 기다리므로 다른 스레드에서 호출
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, drain)
+    try:
+        server.serve_forever()
+        # 새 연결은 더 받지 않고, 이미 받은 요청은 응답을 마칠 때까지 대기
+        if not tracker.wait_idle(GRACEFUL_TIMEOUT):
+            print(f"워커 {os.getpid()}: {GRACEFUL_TIMEOUT:g}초 안에 끝나지 않은 요청 {tracker.in_flight}개를 끊고 종료")
+    finally:
+        os._exit(0)
+
+
+def run_prefork(host, port, workers, backlog=1024):
+    """리스닝 소켓을 만든 뒤 워커를 fork하고, 종료된 워커는 다시 띄움"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+
+    # 로드된 객체를 GC 추적 대상에서 빼서 워커가 공유 메모리 페이지를 복사하지 않도록 함
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            # 요청을 받기 전까지는 SIGTERM이면 바로 종료 (serve_worker가 요청을 마치고 종료하도록 바꿈)
+            # Ctrl+C는 부모가 받아 SIGTERM으로 전달
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            serve_worker(sock, host, port)
+        children[pid] = slot
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for slot in range(workers):
+        spawn(slot)
+    print(f"평가 서버 시작: http://{host}:{port} (워커 {workers}개, pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            print(f"워커 {pid} 종료 (status {status}), 재시작합니다")
+            time.sleep(1)
+            spawn(slot)
+
+    sock.close()
+    print("평가 서버 종료")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="자소서 평가 서버 (pre-fork 멀티 프로세스)")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5002)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WORKERS", available_cpus())),
+                        help="워커 프로세스 수 (기본값: 사용 가능한 CPU 수, 컨테이너 CPU 제한 반영)")
+    args = parser.parse_args()
+
+    # 모델/데이터 로드 및 워밍업은 fork 전에 한 번만 수행
+    evaluator = resume_evaluator.get_evaluator()
+    resume_evaluator.get_essay_index()
+
+    if not hasattr(os, 'fork') or args.workers <= 1:
+        resume_evaluator.warm_up()
+        evaluator.start_data_watcher()
+        resume_evaluator.app.run(host=args.host, port=args.port, threaded=True)
+        return
+
+    # Kiwi의 배치 분석 스레드 풀은 fork된 자식에서 멈추므로 워커에서는 단건 분석 사용
+    # (코어 활용은 워커 프로세스 수로 확보)
+    evaluator.kiwi_batch = False
+    resume_evaluator.warm_up()
+    run_prefork(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
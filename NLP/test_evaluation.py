@@ -42,5 +42,41 @@ def run_test():
     else:
         print("평가 결과 생성 실패")
 
+def run_shared_evaluator_test():
+    # /evaluate 요청들은 프로세스 전역 평가기 하나를 공유
+    import resume_evaluator
+
+    evaluator = resume_evaluator.get_evaluator()
+    assert resume_evaluator.is_evaluator_loaded()
+    assert resume_evaluator.get_evaluator() is evaluator
+
+    user_data = {
+        "회사명": "삼성전자",
+        "직무": "IT·기술영업",
+        "직위": "신입",
+        "qa_pairs": [{"question": "지원동기를 기술해주십시오.", "answer": "기술 혁신을 통해 고객의 삶에 기여하고 싶습니다."}]
+    }
+    client = resume_evaluator.app.test_client()
+    first = client.post('/evaluate', json=user_data).get_json()
+    second = client.post('/evaluate', json=user_data).get_json()
+    assert first == second == resume_evaluator.ResumeEvaluator().evaluate_resume(user_data)
+    assert resume_evaluator.get_evaluator() is evaluator
+    print("\n=== [공유 평가기 테스트 통과] ===")
+
+def run_company_ranking_test():
+    # /evaluate/companies: top_k만큼 순위 반환, 1 미만/정수 아닌 top_k는 400
+    import resume_evaluator
+
+    client = resume_evaluator.app.test_client()
+    qa_pairs = [{"question": "지원동기를 기술해주십시오.", "answer": "기술 혁신을 통해 고객의 삶에 기여하고 싶습니다."}]
+    result = client.post('/evaluate/companies', json={"qa_pairs": qa_pairs, "top_k": 3})
+    assert result.status_code == 200 and result.get_json()['기업수'] == 3
+    for top_k in (-1, 0, "abc", 1.5):
+        response = client.post('/evaluate/companies', json={"qa_pairs": qa_pairs, "top_k": top_k})
+        assert response.status_code == 400, (top_k, response.status_code)
+    print("\n=== [기업 순위 테스트 통과] ===")
+
 if __name__ == "__main__":
     run_test()
+    run_shared_evaluator_test()
+    run_company_ranking_test()
@@ -0,0 +1,90 @@
+# token_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """스레드 안전한 크기 제한 LRU 캐시 (적중/미스/퇴출 횟수 집계, 선택적 TTL)"""
+
+    def __init__(self, maxsize=4096, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl              # 초 단위 유효 기간 (None이면 만료 없음)
+        self._data = OrderedDict()  # 키 -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def contains(self, key):
+        """통계와 LRU 순서에 영향 없이 유효한 항목이 있는지 확인"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            return item is not _MISSING and (item[0] is None or item[0] > time.monotonic())
+
+    def get_or_compute(self, key, compute):
+        """캐시에 없으면 compute()로 계산 후 저장 (계산은 락 밖에서 수행)"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def text_key(namespace, text):
+    """(네임스페이스, 텍스트 해시) 캐시 키 생성"""
+    digest = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    return namespace, digest
+
+
+# 프로세스 전역 형태소 분석 캐시 (ResumeEvaluator / KeywordExtractor 공유)
+token_cache = LRUCache(int(os.environ.get('TOKEN_CACHE_SIZE', 8192)))